@@ -0,0 +1,170 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning_context import CleaningContext
+from cleaning_pipeline import CleaningPipeline
+from normalizer_cache import NormalizerCache
+from sketches import QuantileSketch, SeenKeys
+
+
+def common_dtypes(chunk_dtypes):
+    """
+    The dtype each column gets when the whole file is read at once, from the dtypes of the chunks:
+    integers become floats when some chunk has floats (e.g. missing values), and any text makes
+    the column a text column.
+    """
+    dtypes = {}
+
+    for column in chunk_dtypes[0]:
+        types = {chunk[column] for chunk in chunk_dtypes}
+
+        if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in types):
+            dtypes[column] = np.result_type(*types)
+        elif len(types) > 1:
+            dtypes[column] = object
+
+    return dtypes
+
+
+class SketchContext(CleaningContext):
+    """
+    The `CleaningContext` of `ChunkedCleaner`, which gives the stages the statistics of the whole file
+    rather than of the chunk they get.
+
+    In the sketching pass, the values the statistics are computed on are added to a `QuantileSketch`
+    per statistic and the statistics are NaN, so nothing is filled or capped. `finish_sketching` then
+    computes them from the sketches, for the cleaning pass. In both passes, duplicate keys are found
+    across chunks with `SeenKeys`.
+    """
+
+    def __init__(self, sketch_size=2000, **layers):
+        super().__init__(**layers)
+        self.sketch_size = sketch_size
+        self.sketches = {}
+        # {(column, q): value}, None while sketching
+        self.statistics = None
+        self.seen = SeenKeys()
+        self.distinct_keys = None
+
+    def median(self, values):
+        return self.quantile(values, 0.5)
+
+    def quantile(self, values, q):
+        if self.statistics is None:
+            self.sketches.setdefault((values.name, q), QuantileSketch(self.sketch_size)).update(values)
+            return np.nan
+
+        return self.statistics[values.name, q]
+
+    def first_seen(self, keys):
+        return self.seen.first_seen(keys)
+
+    def finish_sketching(self):
+        """End of the sketching pass: compute the statistics, and forget the keys seen for the next pass"""
+        self.statistics = {(column, q): sketch.quantile(q) for (column, q), sketch in self.sketches.items()}
+        self.distinct_keys = len(self.seen)
+        self.seen = SeenKeys()
+
+        return self.statistics
+
+
+class ChunkedCleaner:
+    """
+    Clean the banking data one chunk of rows at a time, for files larger than memory.
+
+    Every chunk goes through the cleaning `stages` of `data-preparation.py` (a `CleaningPipeline`),
+    which filter and clean every row on its own, with a `SketchContext` for what they compute over
+    the whole dataset: the statistics they fill and cap values with (the median age, the median
+    income, the 0.99 quantile of account balances, the median credit score) and the customer IDs
+    already seen. A first pass over the file finds the dtype of every column (so all chunks are read
+    like the whole file would be), a second pass runs the stages to fill the sketches, and a last pass
+    cleans the chunks with the statistics and appends them to the output file.
+
+    Fuzzy duplicates are not removed (the context has no deduplicator): finding the same customer
+    under different IDs compares records across the whole file. So on files with such duplicates, the
+    chunked output keeps records that the in-memory pipeline removes.
+
+    Memory is bounded by the chunk size, plus 8 bytes per distinct customer ID. The quantiles are
+    exact for up to `sketch_size` values and approximate (within about 1.7 / sketch_size in rank)
+    above; every other value of the rows kept is the same as when cleaning the whole file at once.
+    """
+
+    def __init__(self, stages, columns=None, chunksize=100_000, sketch_size=2000):
+        self.stages = stages
+        self.columns = columns or {}
+        self.chunksize = chunksize
+        self.sketch_size = sketch_size
+
+        self.dtypes = None
+        self.context = None
+        # Per stage and chunk of the cleaning pass: time and rows in/out
+        self.timings = []
+
+    def _read(self, path):
+        for chunk in pd.read_csv(path, chunksize=self.chunksize, dtype=self.dtypes):
+            yield chunk.rename(columns=self.columns)
+
+    def _run(self, path, output_path=None):
+        """Run the stages on every chunk of the file, and append the cleaned chunks to `output_path`"""
+        pipeline = CleaningPipeline(self.stages, trace_memory=False)
+        timings = []
+
+        for chunk in self._read(path):
+            # The stages print their counts for every chunk: `print_summary` prints the totals
+            with contextlib.redirect_stdout(io.StringIO()):
+                chunk = pipeline.run(chunk, self.context)
+
+            timings += pipeline.timings
+
+            if output_path is not None:
+                chunk.to_csv(output_path, mode='a', index=False, header=not os.path.exists(output_path))
+
+        return timings
+
+    def compute_statistics(self, path):
+        """First passes: the dtypes of the columns and the dataset-wide statistics of the cleaning stages"""
+        self.dtypes = None
+        self.dtypes = common_dtypes([chunk.dtypes.to_dict() for chunk in self._read(path)])
+
+        # The states, loans and categories have a few distinct spellings, cleaned once for all chunks
+        self.context = SketchContext(self.sketch_size, normalizers=NormalizerCache())
+        self._run(path)
+
+        return self.context.finish_sketching()
+
+    def clean(self, path, output_path):
+        """Clean the CSV file at `path` chunk by chunk and write the cleaned rows to `output_path`"""
+        print('\n\nClean the banking data in chunks')
+
+        self.compute_statistics(path)
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        self.timings = self._run(path, output_path)
+        self.print_summary()
+
+        return output_path
+
+    def summary(self):
+        """Time and rows in/out of every stage, over all the chunks of the cleaning pass"""
+        summary = pd.DataFrame(self.timings).groupby('stage', sort=False).sum()
+        summary['rows_removed'] = summary['rows_in'] - summary['rows_out']
+
+        return summary
+
+    def print_summary(self):
+        summary = self.summary()
+
+        print(f'Read {summary["rows_in"].iloc[0]} rows and wrote {summary["rows_out"].iloc[-1]} cleaned rows')
+        print(f'{self.context.distinct_keys} distinct customer IDs')
+
+        for (column, q), value in self.context.statistics.items():
+            statistic = 'median' if q == 0.5 else f'{q} quantile'
+            print(f'{statistic} of {column}: {value:,.2f}')
+
+        print(summary.round(4).to_string())
@@ -0,0 +1,52 @@
+class CleaningContext:
+    """
+    What the cleaning stages of a run share, passed to every stage (`CleaningPipeline.run(df, context)`).
+
+    Every column is cleaned through a single layer, picked by the stage:
+
+    - `clean`, for the columns with mostly distinct values (names, incomes, phone numbers, dates):
+      through the `row_cache` (a `RowCache`, which only cleans the new and changed rows), or else on
+      all cores with the `executor` (a `ColumnExecutor`), or else in this process.
+    - `normalize`, for the columns with a few distinct spellings (states, loans, categories): through
+      the `normalizers` (a `NormalizerCache`, which cleans every distinct value once), or else in this
+      process.
+
+    The dataset-wide steps go through the context too: the statistics the stages fill and cap values
+    with (`median`, `quantile`) and the duplicate keys (`first_seen`), computed here on the frame the
+    stage gets, and from the whole file by the context of `ChunkedCleaner`. Fuzzy duplicates are found
+    by the `deduplicator` (a `FuzzyDeduplicator`, or None to keep them), and the clusters it found are
+    kept in `fuzzy_duplicates`.
+    """
+
+    def __init__(self, row_cache=None, executor=None, normalizers=None, deduplicator=None):
+        self.row_cache = row_cache
+        self.executor = executor
+        self.normalizers = normalizers
+        self.deduplicator = deduplicator
+        self.fuzzy_duplicates = None
+
+    def clean(self, function, values, *args):
+        """`function(values, *args)` for a column with mostly distinct values"""
+        if self.row_cache is not None:
+            return self.row_cache.clean(function, values, *args)
+        if self.executor is not None:
+            return self.executor.clean(function, values, *args)
+
+        return function(values, *args)
+
+    def normalize(self, function, values, *args):
+        """`function(values, *args)` for a column with a few distinct values"""
+        if self.normalizers is not None:
+            return self.normalizers.normalize(function, values, *args)
+
+        return function(values, *args)
+
+    def median(self, values):
+        return values.median()
+
+    def quantile(self, values, q):
+        return values.quantile(q)
+
+    def first_seen(self, keys):
+        """Boolean mask of the keys seen for the first time (like `~keys.duplicated(keep='first')`)"""
+        return ~keys.duplicated(keep='first')
@@ -0,0 +1,204 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Vectorized versions of the cleaning functions of `data-preparation.py`. Each function cleans a
+# whole column at once with `.str` methods, compiled regexes and lookup maps, and returns exactly
+# what applying the matching per-value function of `data-preparation.py` to the column returns.
+
+WHITESPACE = re.compile(r'\s+')
+
+# Strings that `float()` accepts and numpy converts in a single C loop. Anything else is passed to
+# `float()` one unique value at a time (e.g. 'nan', 'inf', '1_000' or invalid values).
+SIMPLE_NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+
+LOAN_WORDS = {
+    'none': 0,
+    'zero': 0,
+    'nil': 0,
+    'many': 3,  # Safe/reasonable assumption
+    'several': 3,
+    'few': 1,
+    'some': 1,
+}
+
+PHONE_PREFIXES = ('70', '80', '81', '90', '91')
+
+# Regexes of the `strptime` directives used in date formats, to classify dates by format
+DATE_DIRECTIVES = {
+    '%Y': r'\d+',
+    '%y': r'\d+',
+    '%m': r'\s?\d+',
+    '%d': r'\s?\d+',
+    '%b': r'[^\W\d_]+',
+    '%B': r'[^\W\d_]+',
+}
+
+
+def _python_float(value):
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def parse_floats(texts):
+    """
+    Convert a column of strings to floats like `float()` does, with NaN for invalid values.
+
+    Returns a float64 numpy array.
+    """
+    texts = texts.astype(str)
+    values = np.full(len(texts), np.nan)
+
+    simple = texts.str.fullmatch(SIMPLE_NUMBER).to_numpy(dtype=bool)
+    values[simple] = texts.to_numpy()[simple].astype('float64')
+
+    if not simple.all():
+        others = texts[~simple]
+        lookup = {value: _python_float(value) for value in others.unique()}
+        values[~simple] = others.map(lookup).to_numpy(dtype='float64')
+
+    return values
+
+
+def standardize_names(names):
+    """Strip names, collapse repeated whitespace and title-case them. Missing names stay missing"""
+    cleaned = names.astype(str).str.replace(WHITESPACE, ' ', regex=True).str.strip().str.title()
+
+    return cleaned.where(names.notna(), names)
+
+
+def standardize_states(states, states_map):
+    """Map the abbreviations of `states_map` to state names and title-case the other states"""
+    lowered = states.astype(str).str.lower().str.strip()
+    cleaned = lowered.map(states_map).fillna(lowered.str.title())
+
+    return cleaned.where(states.notna(), states)
+
+
+def clean_income_values(incomes):
+    """Remove the naira sign, thousands separators and spaces from incomes and convert them to floats"""
+    texts = (incomes.astype(str)
+             .str.replace('₦', '', regex=False)
+             .str.replace(',', '', regex=False)
+             .str.replace(' ', '', regex=False)
+             .str.strip())
+
+    values = parse_floats(texts)
+    values[incomes.isna().to_numpy()] = np.nan
+
+    return pd.Series(values, index=incomes.index, name=incomes.name)
+
+
+def _starts_with(texts, prefixes):
+    """Boolean mask of the strings of a numpy object array that start with one of the `prefixes`"""
+    return pd.Series(texts, dtype=object).str.startswith(prefixes).to_numpy(dtype=bool)
+
+
+def clean_phone_numbers(phones):
+    """Convert phone numbers to the 11-digit local format (0XXXXXXXXXX), NaN for invalid numbers"""
+    digits = (phones.astype(str)
+              .str.replace('+', '', regex=False)
+              .str.replace(' ', '', regex=False)
+              .str.replace('-', '', regex=False))
+    length = digits.str.len().to_numpy()
+    present = phones.notna().to_numpy()
+    digits = digits.to_numpy(dtype=object)
+
+    international = present & (length == 13) & _starts_with(digits, '234')
+    missing_zero = present & ~international & (length == 10) & _starts_with(digits, PHONE_PREFIXES)
+    local = present & ~international & ~missing_zero & (length == 11) & _starts_with(digits, '0')
+
+    cleaned = np.full(len(digits), np.nan, dtype=object)
+    cleaned[international] = '0' + pd.Series(digits[international], dtype=object).str[3:].to_numpy(dtype=object)
+    cleaned[missing_zero] = '0' + digits[missing_zero]
+    cleaned[local] = digits[local]
+
+    # Like `.apply`, a column without any valid number is a float column of NaN
+    return pd.Series(cleaned, index=phones.index, name=phones.name, dtype=object).infer_objects()
+
+
+def map_categories(values, mapping):
+    """Replace the values whose lower-cased spelling is in `mapping`, keeping the other values as they are"""
+    return values.astype(str).str.lower().map(mapping).fillna(values)
+
+
+def clean_loan_values(loans):
+    """Convert the number of previous loans to integers, mapping words like 'many' or 'none' to numbers"""
+    words = loans.astype(str).str.lower().map(LOAN_WORDS)
+
+    numbers = parse_floats(loans)
+    numbers[~np.isfinite(numbers)] = 0
+
+    cleaned = np.where(words.notna(), words, np.trunc(numbers))
+    cleaned[loans.isna().to_numpy()] = 0
+
+    return pd.Series(cleaned.astype('int64'), index=loans.index, name=loans.name)
+
+
+def date_format_pattern(date_format):
+    """
+    Regex that every string parsed by `date_format` matches: the separators of the format, with runs of
+    digits for the numeric fields and of letters for month names. It is deliberately loose (it also
+    matches impossible dates like '99-99-2021'), as it is only used to skip the values a format
+    cannot parse. Returns None when the format has directives not listed in `DATE_DIRECTIVES`.
+    """
+    pattern = r'\s*'
+
+    for part in re.split(r'(%.)', date_format):
+        if part.startswith('%'):
+            if part not in DATE_DIRECTIVES:
+                return None
+            pattern += DATE_DIRECTIVES[part]
+        elif part.isspace():
+            pattern += r'\s+'
+        else:
+            pattern += re.escape(part)
+
+    return re.compile(pattern + r'\s*')
+
+
+def clean_dates(dates, date_formats):
+    """
+    Parse dates written in any of the `date_formats`, trying the formats in order for every date
+    (the first format that parses a date wins). Dates that match no format become NaT.
+
+    Every distinct raw value is parsed once. For each format, the values are first classified with
+    `date_format_pattern`, and only the values that can be written in the format (and were not parsed
+    by an earlier format) go through a single `pd.to_datetime` call.
+    """
+    codes, uniques = pd.factorize(dates)
+    texts = pd.Series(uniques, dtype=object).astype(str)
+
+    parsed = np.full(len(texts), np.datetime64('NaT'), dtype='datetime64[ns]')
+    remaining = np.ones(len(texts), dtype=bool)
+
+    for date_format in date_formats:
+        if not remaining.any():
+            break
+
+        pattern = date_format_pattern(date_format)
+
+        candidates = remaining.copy()
+        if pattern is not None:
+            candidates[remaining] = texts[remaining].str.fullmatch(pattern).to_numpy(dtype=bool)
+
+        positions = np.flatnonzero(candidates)
+
+        if not len(positions):
+            continue
+
+        attempt = pd.to_datetime(texts.iloc[positions], format=date_format, errors='coerce')
+        attempt = attempt.to_numpy(dtype='datetime64[ns]')
+        matched = ~np.isnat(attempt)
+
+        parsed[positions[matched]] = attempt[matched]
+        remaining[positions[matched]] = False
+
+    # Missing dates have code -1 and stay NaT
+    cleaned = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+    cleaned[codes >= 0] = parsed[codes[codes >= 0]]
+
+    return pd.Series(cleaned, index=dates.index, name=dates.name)
@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+class CleaningPipeline:
+    """
+    An ordered list of cleaning stages, each a function that takes a DataFrame (and the extra arguments
+    of `run`, e.g. a `CleaningContext`) and returns the cleaned DataFrame, run one after the other.
+
+    Every run records, per stage, the wall time, the rows going in and out, and (with `trace_memory`)
+    the memory the stage allocated and kept, and its peak allocation, as measured by `tracemalloc`.
+
+    The stages run with pandas' copy-on-write mode: filtering, selecting columns or copying a frame
+    no longer copies the data up front, only the columns a later stage modifies are copied, and the
+    input DataFrame is never modified.
+    """
+
+    def __init__(self, stages, trace_memory=True, copy_on_write=True):
+        # Stages are functions, or (name, function) pairs to give a stage another name
+        self.stages = [stage if isinstance(stage, tuple) else (stage.__name__, stage) for stage in stages]
+        self.trace_memory = trace_memory
+        self.copy_on_write = copy_on_write
+        self.timings = []
+
+    def _run_stage(self, name, function, df, args):
+        rows_in = len(df)
+
+        if self.trace_memory:
+            tracemalloc.start()
+            tracemalloc.reset_peak()
+            memory_before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        df = function(df, *args)
+        seconds = time.perf_counter() - start
+
+        timing = {'stage': name, 'seconds': seconds, 'rows_in': rows_in, 'rows_out': len(df)}
+
+        if self.trace_memory:
+            memory_after, peak = tracemalloc.get_traced_memory()
+            timing['memory_delta_mb'] = (memory_after - memory_before) / 1024 ** 2
+            timing['peak_memory_mb'] = (peak - memory_before) / 1024 ** 2
+
+        self.timings.append(timing)
+
+        return df
+
+    def run(self, df, *args):
+        """Run every stage on `df` (and `args`) and return the cleaned DataFrame. `df` itself is left unchanged"""
+        self.timings = []
+        tracing = tracemalloc.is_tracing()
+
+        try:
+            with pd.option_context('mode.copy_on_write', self.copy_on_write):
+                for name, function in self.stages:
+                    df = self._run_stage(name, function, df, args)
+        finally:
+            # Leave tracemalloc as it was (e.g. when the whole script is being profiled)
+            if self.trace_memory and not tracing:
+                tracemalloc.stop()
+
+        return df
+
+    def summary(self):
+        """Timings of the last run, one row per stage, with each stage's share of the total time"""
+        summary = pd.DataFrame(self.timings).set_index('stage')
+        summary['time_share'] = summary['seconds'] / summary['seconds'].sum()
+        summary['rows_removed'] = summary['rows_in'] - summary['rows_out']
+
+        return summary
+
+    def print_summary(self):
+        print('\n\nCleaning pipeline stages')
+        print(self.summary().round(4).to_string())
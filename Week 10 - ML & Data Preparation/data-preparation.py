@@ -3,6 +3,17 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import numpy as np
 
+from chunked_cleaning import ChunkedCleaner
+from cleaning_pipeline import CleaningPipeline
+from data_profiling import binned_missingness, draw_missingness, profile_csv, save_profile
+from cleaning_engine import (clean_dates, clean_income_values, clean_loan_values, clean_phone_numbers,
+                             map_categories, standardize_names, standardize_states)
+from cleaning_context import CleaningContext
+from incremental_cleaning import RowCache
+from normalizer_cache import NormalizerCache
+from record_linkage import FuzzyDeduplicator
+
+
 def load_banking_data(path):
     """Loads student data from a CSV file specified in the path argument"""
 
@@ -10,9 +21,9 @@ def load_banking_data(path):
 
 
 def visualize_missing_data(df):
+    # Share of missing values in 100 ranges of rows, rather than one heatmap row per data row
     plt.figure(figsize=(8, 10))
-    sns.heatmap(df.isnull(), cbar=True, yticklabels=False)
-    plt.title('Missing Data Patterns')
+    draw_missingness(binned_missingness(df, bins=100), plt.gca())
     plt.tight_layout()
     plt.show()
 
@@ -35,7 +46,7 @@ def data_exploration(df):
     print(df.info())
 
 
-def handle_missing_data(df):
+def handle_missing_data(df, context):
     """Find and handle missing data"""
 
     print('\n\nHandle Missing Customer IDs')
@@ -48,52 +59,82 @@ def handle_missing_data(df):
     return new_df
 
 
-def remove_duplicate_records(df):
+def remove_duplicate_records(df, context):
     print('\n\nRemove duplicate records')
 
-    duplicated_records = df.duplicated(subset=['customer_id']).sum()
-    df = df.drop_duplicates(subset=['customer_id'], keep='first')
+    # Keep the first record of every customer ID (across all the chunks, when cleaning in chunks)
+    first = context.first_seen(df['customer_id'])
+    duplicated_records = (~first).sum()
+    df = df[first]
 
     print(f'Removed {duplicated_records} duplicate records')
 
     return df
 
 
-def clean_customers_names(df):
-    print('\n\nClean customers\' names')
+def remove_fuzzy_duplicates(df, context):
+    print('\n\nRemove fuzzy duplicate records')
 
-    # Use a heatmap to visualize the number of cells with missing data, for each column
-    visualize_missing_data(df)
+    deduplicator = context.deduplicator
 
-    # Remove empty names
-    empty_name_count = ((df['full_name'].isnull()) | (df['full_name'].str.strip() == '')).sum()
+    if deduplicator is None:
+        print('Kept the fuzzy duplicates (no deduplicator)')
+        return df
 
-    df = df[df['full_name'].notna() & (df['full_name'].str.strip() != '')]
+    # Same customer under another (e.g. malformed) ID, with a name or phone number variation
+    # The features of every record (e.g. normalized names) go through the row cache like the column cleaners
+    df, fuzzy_duplicates = deduplicator.deduplicate(df, context.clean)
+    context.fuzzy_duplicates = fuzzy_duplicates
+
+    removed = (~fuzzy_duplicates['kept']).sum()
+    print(f'Removed {removed} duplicate records in {fuzzy_duplicates["cluster"].nunique()} clusters')
 
-    def standardize_name(name):
-        if pd.isna(name):
-            return name
+    if deduplicator.skipped_rows:
+        print(f'Did not compare {deduplicator.skipped_rows} records of {deduplicator.skipped_blocks} '
+              f'blocks larger than {deduplicator.max_block_size} records')
 
-        # Remove extra spaces
-        name = str(name).strip()
+    # The first clusters (`main` saves all of them)
+    if len(fuzzy_duplicates):
+        print(fuzzy_duplicates.head(10).to_string())
 
-        # Remove multiple spaces
-        name = ' '.join(name.split())
+    return df
 
-        # Standardize capitalization
-        name = name.title()
 
+# The per-value cleaning functions below are the reference for the vectorized functions of
+# `cleaning_engine.py` that the pipeline uses (see `tests/test_cleaning_engine.py`).
+
+def standardize_name(name):
+    if pd.isna(name):
         return name
 
+    # Remove extra spaces
+    name = str(name).strip()
+
+    # Remove multiple spaces
+    name = ' '.join(name.split())
 
-    df['full_name'] = df['full_name'].apply(standardize_name)
+    # Standardize capitalization
+    name = name.title()
+
+    return name
+
+
+def clean_customers_names(df, context):
+    print('\n\nClean customers\' names')
+
+    # Remove empty names
+    empty_name_count = ((df['full_name'].isnull()) | (df['full_name'].str.strip() == '')).sum()
+
+    df = df[df['full_name'].notna() & (df['full_name'].str.strip() != '')]
+
+    df['full_name'] = context.clean(standardize_names, df['full_name'])
 
     print(f'Removed {empty_name_count} rows with empty customer names')
 
     return df
 
 
-def handle_outliers(df):
+def handle_outliers(df, context):
     print('\n\nHandle outliers and missing data in age')
 
     outliers_count = (
@@ -110,7 +151,7 @@ def handle_outliers(df):
     ]
 
     # Fill missing age with median
-    median_age = df['age'].median()
+    median_age = context.median(df['age'])
     df.fillna({'age': median_age}, inplace=True)
 
     print(f'Removed {outliers_count} rows with empty with invalid ages')
@@ -119,67 +160,68 @@ def handle_outliers(df):
     return df
 
 
-def standardize_state_names(df):
-    print('\n\nStandardize state names')
+# State mapping
+STATES_MAP = {
+    'ab.uj': 'Abuja',
+    'an.am.': 'Anambra',
+    'ji.ga.': 'Jigawa',
+    'so.ko.': 'Sokoto',
+    'Na.sa.': 'Nasarawa',
+    'go.mb.': 'Gombe',
+    'cr.os.': 'Cross River',
+    'za.mf.': 'Zamfara',
+}
 
-    # State mapping
-    states_map = {
-        'ab.uj': 'Abuja',
-        'an.am.': 'Anambra',
-        'ji.ga.': 'Jigawa',
-        'so.ko.': 'Sokoto',
-        'Na.sa.': 'Nasarawa',
-        'go.mb.': 'Gombe',
-        'cr.os.': 'Cross River',
-        'za.mf.': 'Zamfara',
-    }
 
-    def standardize_state(state):
-        if pd.isna(state):
-            return state
+def standardize_state(state):
+    if pd.isna(state):
+        return state
+
+    state = str(state).lower().strip()
 
-        state = str(state).lower().strip()
+    if state in STATES_MAP:
+        return STATES_MAP[state]
 
-        if state in states_map:
-            return states_map[state]
+    return state.title()
 
-        return state.title()
 
+def standardize_state_names(df, context):
+    print('\n\nStandardize state names')
 
-    df['state'] = df['state'].apply(standardize_state)
+    df['state'] = context.normalize(standardize_states, df['state'], STATES_MAP)
 
     return df
 
 
-def clean_income_data(df):
-    print('\n\nClean income data')
+def clean_income_value(income):
+    if pd.isna(income):
+        return np.nan
 
-    def clean_income_value(income):
-        if pd.isna(income):
-            return np.nan
+    # Method chaining
 
-        # Method chaining
+    # wrap in string object and clean
+    # NOTE: Can also be done with a regex
+    income_str = (str(income).replace('₦', '')
+                  .replace(',', '')
+                  .replace( ' ', '')
+                  .strip())
 
-        # wrap in string object and clean
-        # NOTE: Can also be done with a regex
-        income_str = (str(income).replace('₦', '')
-                      .replace(',', '')
-                      .replace( ' ', '')
-                      .strip())
+    try:
+        return float(income_str)
+    except ValueError:
+        return np.nan
 
-        try:
-            return float(income_str)
-        except ValueError:
-            return np.nan
 
-    #
-    df['monthly_income'] = df['monthly_income'].apply(clean_income_value)
+def clean_income_data(df, context):
+    print('\n\nClean income data')
+
+    df['monthly_income'] = context.clean(clean_income_values, df['monthly_income'])
 
 
     # Fill missing incomes with median
     missing_income_count = df['monthly_income'].isnull().sum()
 
-    median_income = df['monthly_income'].median()
+    median_income = context.median(df['monthly_income'])
     df.fillna({'monthly_income': median_income}, inplace=True)
 
     print('Fixed income formatting issues')
@@ -188,7 +230,7 @@ def clean_income_data(df):
     return df
 
 
-def handle_account_balance_outliers(df):
+def handle_account_balance_outliers(df, context):
     print('\n\nHandle account balance outliers')
 
     # Remove impossible/negative balances (likely data errors)
@@ -199,11 +241,12 @@ def handle_account_balance_outliers(df):
     df = df[df['account_balance'] >= 0]
 
     # Cap extremely high balances (potential outliers)
-    q99 = df['account_balance'].quantile(0.99)
+    q99 = context.quantile(df['account_balance'], 0.99)
 
-    extreme_balances_count = df[df['account_balance'] > q99 * 10].sum()
+    extreme_balances = df['account_balance'] > q99 * 10
+    extreme_balances_count = extreme_balances.sum()
 
-    df.loc[df['account_balance'] > q99 * 10, 'account_balance'] = q99
+    df.loc[extreme_balances, 'account_balance'] = q99
 
     print(f'Removed {negative_balances_count} rows with negative account balance')
     print(f'Capped {extreme_balances_count} extremely high account balance')
@@ -211,45 +254,46 @@ def handle_account_balance_outliers(df):
     return df
 
 
-def standardize_phone_numbers(df):
-    print('\n\nStandardize phone numbers')
-
-    def clean_phone_number(phone):
-        if pd.isna(phone):
-            return np.nan
+def clean_phone_number(phone):
+    if pd.isna(phone):
+        return np.nan
 
-        # Remove all non-digits
-        phone = (str(phone).replace('+', '')
-                 .replace(' ', '')
-                 .replace('-', ''))
+    # Remove all non-digits
+    phone = (str(phone).replace('+', '')
+             .replace(' ', '')
+             .replace('-', ''))
+
+    # Using regex
+    # phone = re.sub(r'\\D', '', str(phone))
+
+    # Handle different formats
+    if phone.startswith('234') and len(phone) == 13:
+        phone = '0' + phone[3:]
+    elif len(phone) == 10 and phone.startswith(('70', '80', '81', '90', '91')):
+        phone = '0' + phone
+    elif len(phone) == 11 and phone.startswith('0'):
+        pass
+    else:
+        return np.nan
 
-        # Using regex
-        # phone = re.sub(r'\\D', '', str(phone))
+    # Validate the final format
+    if len(phone) == 11 and phone.startswith('0'):
+        return phone
+    else:
+        return np.nan
 
-        # Handle different formats
-        if phone.startswith('234') and len(phone) == 13:
-            phone = '0' + phone[3:]
-        elif len(phone) == 10 and phone.startswith(('70', '80', '81', '90', '91')):
-            phone = '0' + phone
-        elif len(phone) == 11 and phone.startswith('0'):
-            pass
-        else:
-            return np.nan
 
-        # Validate the final format
-        if len(phone) == 11 and phone.startswith('0'):
-            return phone
-        else:
-            return np.nan
+def standardize_phone_numbers(df, context):
+    print('\n\nStandardize phone numbers')
 
-    df['phone_number'] = df['phone_number'].apply(clean_phone_number)
+    df['phone_number'] = context.clean(clean_phone_numbers, df['phone_number'])
 
     # Drop columns with null values
 
     return df
 
 
-def standardize_categorical_variables(df):
+def standardize_categorical_variables(df, context):
     print('\n\nStandardize categorical variables')
 
     employment_map = {
@@ -257,8 +301,7 @@ def standardize_categorical_variables(df):
         'public': 'Government',
     }
 
-    #
-    df['employment_type'] = df['employment_type'].str.lower.map(employment_map).fillna(df['employment_type'])
+    df['employment_type'] = context.normalize(map_categories, df['employment_type'], employment_map)
 
 
     marital_status_map = {
@@ -268,33 +311,33 @@ def standardize_categorical_variables(df):
         'm': 'Married',
     }
 
-    #
-    df['marital_status'] = df['marital_status_map'].str.lower.map(marital_status_map).fillna(df['marital_status'])
+    df['marital_status'] = context.normalize(map_categories, df['marital_status'], marital_status_map)
 
     return df
 
 
-def clean_loan_history(df):
+def clean_loan_value(loan_value):
+    if pd.isna(loan_value):
+        return 0
 
-    def clean_loan_value(loan_value):
-        if pd.isna(loan_value):
-            return 0
+    # Handle text values
+    loan_str = str(loan_value).lower()
+    if loan_str in ['none', 'zero', 'nil']:
+        return 0
+    elif loan_str in ['many', 'several']:
+        return 3 # Safe/reasonable assumption
+    elif loan_str in ['few', 'some']:
+        return 1
 
-        # Handle text values
-        loan_str = str(loan_value).lower()
-        if loan_str in ['none', 'zero', 'nil']:
-            return 0
-        elif loan_str in ['many', 'several']:
-            return 3 # Safe/reasonable assumption
-        elif loan_str in ['few', 'some']:
-            return 1
+    try:
+        return int(float(loan_value))
+    except ValueError:
+        return 0
 
-        try:
-            return int(float(loan_value))
-        except ValueError:
-            return 0
 
-    df['previous_loans'] = df['previous_loans'].apply(clean_loan_value)
+def clean_loan_history(df, context):
+
+    df['previous_loans'] = context.normalize(clean_loan_values, df['previous_loans'])
 
     return df
 
@@ -303,24 +346,26 @@ def clean_loan_history(df):
 # https://www.programiz.com/python-programming/datetime
 # https://www.geeksforgeeks.org/python-datetime-module/
 
-def clean_date_formats(df):
+# Try different date formats
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%m-%d-%Y', '%d-%b-%Y', '%Y/%m/%d', '%d-%m-%Y']
 
-    def clean_date(date):
-        if pd.isna(date) or str(date).strip == '':
-            return np.nan
 
-        # Try different date formats
-        date_formats = ['%Y-%m-%d', '%d/%m/%Y', '%m-%d-%Y', '%d-%b-%Y', '%Y/%m/%d', '%d-%m-%Y']
+def clean_date(date):
+    if pd.isna(date) or str(date).strip == '':
+        return np.nan
 
-        for fmt in date_formats:
-            try:
-                return pd.to_datetime(str(date), format=fmt)
-            except ValueError:
-                continue
+    for fmt in DATE_FORMATS:
+        try:
+            return pd.to_datetime(str(date), format=fmt)
+        except ValueError:
+            continue
 
-        return np.nan
+    return np.nan
+
+
+def clean_date_formats(df, context):
 
-    df['registration_date'] = df['registration_date'].apply(clean_date)
+    df['registration_date'] = context.clean(clean_dates, df['registration_date'], DATE_FORMATS)
 
     # Drop rows/cells with nan value
     df = df.dropna(subset=['registration_date'])
@@ -328,7 +373,7 @@ def clean_date_formats(df):
     return df
 
 
-def handle_credit_scores(df):
+def handle_credit_scores(df, context):
     # Remove outliers/impossible values
     df =  df[
         (df['credit_score'].isnull()) |
@@ -336,13 +381,105 @@ def handle_credit_scores(df):
     ]
 
     # Fill missing credit scores with median
-    median_credit_score = df['credit_score'].median()
+    median_credit_score = context.median(df['credit_score'])
     df.fillna({'credit_score': median_credit_score}, inplace=True)
 
     return df
 
 
+# The cleaning stages, in the order they run
+CLEANING_STAGES = [
+    # Handle missing data
+    handle_missing_data,
+
+    # Remove all duplicated customer ID rows, while retaining the first/initial occurrence
+    remove_duplicate_records,
+
+    # Remove the records of the same customer under different IDs
+    remove_fuzzy_duplicates,
+
+    # Properly formats the presentation of the full names of customers
+    clean_customers_names,
+
+    # Removed impossible age values and fill rows with missing values with the median age of customers
+    handle_outliers,
+
+    standardize_state_names,
+
+    clean_income_data,
+
+    handle_account_balance_outliers,
+
+    standardize_phone_numbers,
+
+    # standardize_categorical_variables,
+
+    clean_date_formats,
+
+    clean_loan_history,
+
+    handle_credit_scores,
+]
+
+
+def parse_dates(dates):
+    return clean_dates(dates, DATE_FORMATS)
+
+
+def banking_data_profile(path, sample_fraction=None, chunksize=100_000):
+    """Data quality profile of a banking data file, computed over chunks of the file (see `DataProfiler`)"""
+    return profile_csv(
+        path,
+        chunksize=chunksize,
+        columns={'employment-type': 'employment_type', 'registration date': 'registration_date'},
+        validators={
+            'phone_number': clean_phone_numbers,
+            'monthly_income': clean_income_values,
+            'registration_date': parse_dates,
+        },
+        sample_fraction=sample_fraction,
+    )
+
+
+def profile_banking_data(path, report_path, sample_fraction=None):
+    """
+    Data quality report of a banking data file (HTML or JSON, from the extension of `report_path`),
+    computed in one pass over chunks of the file, so it works on files of any size.
+    """
+    return save_profile(banking_data_profile(path, sample_fraction), report_path)
+
+
+def clean_banking_data_in_chunks(path, output_path, chunksize=100_000):
+    """
+    Clean a banking data file larger than memory, one chunk of rows at a time, with the same stages
+    as the whole file (see `ChunkedCleaner`). Fuzzy duplicates are not removed in chunks.
+    """
+    cleaner = ChunkedCleaner(
+        CLEANING_STAGES,
+        columns={'employment-type': 'employment_type', 'registration date': 'registration_date'},
+        chunksize=chunksize,
+    )
+
+    return cleaner.clean(path, output_path)
+
+
 def main():
+    # What the cleaning stages share: the cleaned rows and the clean values remembered by the previous
+    # runs, and the deduplicator of the records of the same customer under different IDs. To clean
+    # every row again, on all cores, pass `executor=ColumnExecutor()` (see `parallel_cleaning.py`)
+    # instead of the row cache
+    context = CleaningContext(
+        row_cache=RowCache('../../data/.cleaning_manifest.pkl'),
+        normalizers=NormalizerCache('../../data/.normalizer_cache.pkl'),
+        deduplicator=FuzzyDeduplicator(),
+    )
+
+    # Data quality report of the raw data
+    # profile_banking_data('../../data/banking_data.csv', '../../data/reports/banking_data_quality.html')
+
+    # For files larger than memory, clean the data in chunks instead
+    # clean_banking_data_in_chunks('../../data/banking_data.csv', '../../data/banking_data_formatted.csv')
+
     banking_df = load_banking_data('../../data/banking_data.csv')
 
     # Change the column name for employment type using any one of the approaches below
@@ -358,37 +495,29 @@ def main():
     # Rename registration date column
     banking_df.rename(columns={'registration date': 'registration_date'}, inplace=True)
 
-    new_df = banking_df.copy()
-
-    # Handle missing data
-    new_df = handle_missing_data(new_df)
-
-    # Remove all duplicated customer ID rows, while retaining the first/initial occurrence
-    new_df = remove_duplicate_records(new_df)
-
-    # Properly formats the presentation of the full names of customers
-    new_df = clean_customers_names(new_df)
-
-    # Removed impossible age values and fill rows with missing values with the median age of customers
-    new_df = handle_outliers(new_df)
-
-    new_df = standardize_state_names(new_df)
-
-    new_df = clean_income_data(new_df)
-
-    new_df = handle_account_balance_outliers(new_df)
+    # Use a heatmap to visualize the number of cells with missing data, for each column
+    visualize_missing_data(banking_df)
 
-    new_df = standardize_phone_numbers(new_df)
+    # Find the rows that changed since the last run
+    context.row_cache.start(banking_df)
 
-    # new_df = standardize_categorical_variables(new_df)
+    # Clean the data. The pipeline doesn't modify `banking_df`, so no copy is needed
+    pipeline = CleaningPipeline(CLEANING_STAGES)
+    new_df = pipeline.run(banking_df, context)
 
-    new_df = clean_date_formats(new_df)
+    # Time, rows in/out and memory of every stage
+    pipeline.print_summary()
 
-    new_df = clean_loan_history(new_df)
+    # Keep the clean values for the next run
+    context.normalizers.save()
 
-    new_df = handle_credit_scores(new_df)
+    # Append the new rows to the formatted file when possible, and remember the cleaned rows
+    context.row_cache.write_output(new_df, '../../data/banking_data_formatted.csv')
+    context.row_cache.save()
 
-    new_df.to_csv('../../data/banking_data_formatted.csv', index=False)
+    # Every cluster of fuzzy duplicates, with the record kept and the records removed
+    if context.fuzzy_duplicates is not None:
+        context.fuzzy_duplicates.to_csv('../../data/banking_data_fuzzy_duplicates.csv', index_label='row')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,249 @@
+import base64
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from chunked_cleaning import common_dtypes
+from sketches import HyperLogLog, QuantileSketch
+
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+
+def binned_missingness(df, bins=100):
+    """
+    Share of missing values per column in `bins` consecutive ranges of rows: a `bins` x columns
+    frame to draw instead of the rows x columns `df.isnull()`, which is unreadable for large data.
+    """
+    bins = max(1, min(bins, len(df)))
+    row_bins = np.arange(len(df)) * bins // max(len(df), 1)
+
+    missing = df.isnull().groupby(row_bins).mean()
+    missing.index = [f'{start:,}' for start in np.searchsorted(row_bins, missing.index)]
+
+    return missing
+
+
+def draw_missingness(missing, ax):
+    sns.heatmap(missing, cbar=True, vmin=0, vmax=1, ax=ax)
+    ax.set_title('Missing Data Patterns (share of missing values per range of rows)')
+    ax.set_ylabel('First row of the range')
+
+
+class ColumnProfile:
+    """Running statistics of one column: counts, distinct values, range and quantiles, invalid values"""
+
+    def __init__(self, name):
+        self.name = name
+        self.dtypes = set()
+        self.rows = 0
+        self.nulls = 0
+        self.profiled = 0
+        self.distinct = HyperLogLog()
+        self.quantiles = None
+        self.minimum = None
+        self.maximum = None
+        self.invalid = 0
+        self.invalid_examples = []
+
+    def _update_range(self, values):
+        values = values.dropna()
+
+        if not len(values):
+            return
+
+        minimum, maximum = values.min(), values.max()
+        self.minimum = minimum if self.minimum is None else min(self.minimum, minimum)
+        self.maximum = maximum if self.maximum is None else max(self.maximum, maximum)
+
+    def update(self, values, sample, validator=None):
+        """Add a chunk of the column. Counts use every row, the other statistics the `sample` rows only"""
+        self.dtypes.add(str(values.dtype))
+        self.rows += len(values)
+        self.nulls += int(values.isnull().sum())
+
+        values = values[sample]
+        self.profiled += len(values)
+        self.distinct.update(values)
+
+        # Range and quantiles of the numbers, or of the parsed values for columns with a validator
+        parsed = values
+
+        if validator is not None:
+            parsed = validator(values)
+
+            invalid = values.notna() & parsed.isna()
+            self.invalid += int(invalid.sum())
+
+            # The first 5 distinct invalid values of the file (a value may be in several chunks)
+            missing_examples = 5 - len(self.invalid_examples)
+            if missing_examples > 0:
+                examples = pd.Index(values[invalid].astype(str).unique()).difference(self.invalid_examples, sort=False)
+                self.invalid_examples += examples[:missing_examples].tolist()
+
+        # A chunk without any valid value parses to NaN floats, whatever the column holds
+        if not parsed.notna().any():
+            return
+
+        if pd.api.types.is_numeric_dtype(parsed) and not pd.api.types.is_bool_dtype(parsed):
+            self.quantiles = self.quantiles or QuantileSketch()
+            self.quantiles.update(parsed)
+            self._update_range(parsed)
+        elif pd.api.types.is_datetime64_any_dtype(parsed):
+            self._update_range(parsed)
+
+    def summary(self):
+        summary = {
+            'dtype': ' / '.join(sorted(self.dtypes)),
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'null_rate': self.nulls / self.rows if self.rows else None,
+            'distinct': self.distinct.count(),
+            'min': self.minimum,
+            'max': self.maximum,
+        }
+
+        for q in QUANTILES:
+            summary[f'q{q * 100:g}'] = self.quantiles.quantile(q) if self.quantiles else None
+
+        summary['invalid'] = self.invalid
+        summary['invalid_rate'] = self.invalid / self.profiled if self.profiled else None
+        summary['invalid_examples'] = self.invalid_examples
+
+        return summary
+
+
+class DataProfiler:
+    """
+    Data quality profile of a dataset, built in a single pass over chunks of rows.
+
+    Per column: null counts, distinct counts (`HyperLogLog`), min/max and quantiles (`QuantileSketch`)
+    and, for the columns with a validator, the number of values that don't parse (e.g. phone numbers or
+    dates in an unknown format). A validator is a cleaning function of `cleaning_engine.py` that returns
+    NaN for invalid values.
+
+    Null counts and missingness use every row. With `sample_fraction`, the other statistics are computed
+    on that share of the rows, picked at random, which is much faster on large files.
+
+    Missingness is kept as null counts per block of `block_rows` rows, and drawn as a heatmap of at
+    most `bins` ranges of rows.
+    """
+
+    def __init__(self, validators=None, sample_fraction=None, block_rows=1000, seed=0):
+        self.validators = validators or {}
+        self.sample_fraction = sample_fraction
+        self.block_rows = block_rows
+        self.rng = np.random.default_rng(seed)
+
+        self.columns = {}
+        self.rows = 0
+        # Null counts (and row count) per block of rows, one frame per chunk
+        self._block_nulls = []
+
+    def update(self, chunk):
+        if self.sample_fraction:
+            sample = self.rng.random(len(chunk)) < self.sample_fraction
+        else:
+            sample = np.ones(len(chunk), dtype=bool)
+
+        for column in chunk.columns:
+            profile = self.columns.setdefault(column, ColumnProfile(column))
+            profile.update(chunk[column], sample, self.validators.get(column))
+
+        blocks = (self.rows + np.arange(len(chunk))) // self.block_rows
+        self._block_nulls.append(chunk.isnull().assign(rows=1).groupby(blocks).sum())
+
+        self.rows += len(chunk)
+
+        return self
+
+    def missingness(self, bins=100):
+        """Share of missing values per column in at most `bins` consecutive ranges of rows"""
+        # A block can span two chunks
+        blocks = pd.concat(self._block_nulls).groupby(level=0).sum()
+        bins = max(1, min(bins, len(blocks)))
+        groups = np.arange(len(blocks)) * bins // len(blocks)
+
+        grouped = blocks.groupby(groups).sum()
+        missing = grouped.drop(columns='rows').div(grouped['rows'], axis=0)
+        missing.index = [f'{block * self.block_rows:,}' for block in blocks.index[np.searchsorted(groups, grouped.index)]]
+
+        return missing
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'sample_fraction': self.sample_fraction,
+            'columns': {name: profile.summary() for name, profile in self.columns.items()},
+        }
+
+
+def profile_csv(path, chunksize=100_000, columns=None, **options):
+    """
+    Profile a CSV file chunk by chunk (see `DataProfiler` for the `options`).
+
+    `pd.read_csv` infers the dtypes of every chunk on its own, and the same value hashes (and sorts)
+    differently as an integer, a float or a string. So a first pass finds the dtype of every column
+    over the whole file (like `ChunkedCleaner`), and every chunk is read with it: the profile is the
+    same whatever the chunk size.
+    """
+    dtypes = common_dtypes([chunk.dtypes.to_dict() for chunk in pd.read_csv(path, chunksize=chunksize)])
+    profiler = DataProfiler(**options)
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, dtype=dtypes):
+        profiler.update(chunk.rename(columns=columns or {}))
+
+    return profiler
+
+
+def _to_json(value):
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return str(value)
+
+
+def save_profile(profiler, path, bins=100):
+    """Save the profile as JSON or, for an `.html` path, as a page with the table and the missingness heatmap"""
+    report = profiler.report()
+
+    if os.path.splitext(path)[1].lower() != '.html':
+        report['missingness'] = profiler.missingness(bins).round(4).to_dict('index')
+
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=2, default=_to_json)
+
+        return path
+
+    figure = Figure(figsize=(8, 10))
+    FigureCanvasAgg(figure)
+    draw_missingness(profiler.missingness(bins), figure.add_subplot())
+    figure.tight_layout()
+
+    image = io.BytesIO()
+    figure.savefig(image, format='png', dpi=100)
+
+    table = pd.DataFrame(report['columns']).T.to_html(na_rep='', float_format=lambda value: f'{value:,.4g}')
+
+    with open(path, 'w') as file:
+        file.write(f'''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Data quality report</title></head>
+<body>
+<h1>Data quality report</h1>
+<p>{report["rows"]:,} rows{f", statistics on a {report['sample_fraction']:.0%} sample" if report["sample_fraction"] else ""}</p>
+{table}
+<h2>Missing data</h2>
+<img src="data:image/png;base64,{base64.b64encode(image.getvalue()).decode()}">
+</body>
+</html>
+''')
+
+    return path
@@ -0,0 +1,129 @@
+import functools
+import hashlib
+import inspect
+import marshal
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Bump when the format of the saved cache changes. Changes to the cleaners are found by `code_hash`
+CACHE_VERSION = 2
+
+
+@functools.cache
+def code_hash(function):
+    """
+    Hash of the code a cleaner runs: the source of its whole module, so that editing the cleaner, a
+    helper or a constant it uses gives another hash (or of its bytecode, when there is no source).
+    """
+    try:
+        code = inspect.getsource(inspect.getmodule(function)).encode()
+    except (TypeError, OSError):
+        code = marshal.dumps(function.__code__)
+
+    return hashlib.sha256(code).hexdigest()
+
+
+def _key(value):
+    # 1, 1.0 and True are equal dict keys, but may not clean to the same value
+    return type(value).__name__, value
+
+
+class NormalizerCache:
+    """
+    Clean a column once per distinct raw value, remembering the raw -> clean values across runs.
+
+    Low-cardinality dirty columns (states, employment types, marital statuses, loan counts) repeat a
+    few spellings over many rows, so `normalize` factorizes the column, cleans only the distinct values
+    that are not cached yet, and takes the clean value of every row from the distinct ones: the cost
+    grows with the number of distinct values, not rows. Columns whose values are mostly distinct (phone
+    numbers, and names in real customer data) gain nothing from it: every value is a miss, looked up
+    and stored one by one in Python, which is slower than the vectorized cleaner on the whole column
+    (0.55s against 0.35s for 300,000 phone numbers), and they would churn the LRU.
+
+    The cache keeps at most `max_entries` values per cleaner (dropping the least recently used) and
+    is saved to `path` with `save()` and loaded back when the cache is created. The values of a cleaner
+    are keyed by the hash of its code, so they are cleaned again after the cleaner changes.
+    """
+
+    def __init__(self, path=None, max_entries=100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.caches = {}
+        self.hits = 0
+        self.misses = 0
+
+        if path and os.path.exists(path):
+            with open(path, 'rb') as file:
+                version, caches = pickle.load(file)
+
+            if version == CACHE_VERSION:
+                self.caches = caches
+
+    def _cache(self, function, args):
+        """The raw -> clean values of a cleaner called with `args` (e.g. another states map gets its own cache)"""
+        arguments = hashlib.sha256(repr(args).encode()).hexdigest()
+        key = (function.__name__, code_hash(function), arguments)
+
+        if key not in self.caches:
+            # The values of the previous code of the cleaner are stale
+            for stale in [cached for cached in self.caches if cached[0] == key[0] and cached[2] == key[2]]:
+                del self.caches[stale]
+
+        return self.caches.setdefault(key, OrderedDict())
+
+    def normalize(self, function, values, *args):
+        """`function(values, *args)`, computed on the distinct values of the column only"""
+        codes, uniques = pd.factorize(values)
+        uniques = list(uniques)
+
+        # Missing values are cleaned too (e.g. a missing loan count becomes 0), but not cached
+        missing = None
+        if (codes == -1).any():
+            missing = len(uniques)
+            codes = np.where(codes == -1, missing, codes)
+            uniques.append(np.nan)
+
+        cache = self._cache(function, args)
+        keys = [_key(value) for value in uniques]
+        cleaned = [None] * len(uniques)
+        new = []
+
+        for position, key in enumerate(keys):
+            if position != missing and key in cache:
+                cache.move_to_end(key)
+                cleaned[position] = cache[key]
+            else:
+                new.append(position)
+
+        self.hits += len(uniques) - len(new)
+        self.misses += len(new)
+
+        if new:
+            raw = pd.Series([uniques[position] for position in new], dtype=object)
+            clean = function(raw, *args)
+
+            for position, value in zip(new, clean.tolist()):
+                cleaned[position] = value
+
+                if position != missing:
+                    cache[keys[position]] = value
+
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+        # Let pandas pick the dtype, as `.apply` would (e.g. datetimes, or floats when all are NaN)
+        cleaned = pd.Series(cleaned, dtype=object).infer_objects()
+
+        return pd.Series(cleaned.to_numpy().take(codes), index=values.index, name=values.name)
+
+    def save(self):
+        """Save the cached values to `path`, for the next runs"""
+        if self.path:
+            with open(self.path, 'wb') as file:
+                pickle.dump((CACHE_VERSION, self.caches), file)
+
+        return self.path
@@ -0,0 +1,150 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _to_arrow(series):
+    """Arrow IPC stream of a column, or None when pyarrow is missing or can't hold the values (e.g. mixed types)"""
+    if pa is None:
+        return None
+
+    try:
+        table = pa.table({'values': pa.array(series, from_pandas=True)})
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return None
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    return sink.getvalue()
+
+
+def _from_arrow(buffer, dtype=None):
+    """
+    Column of an Arrow IPC stream, with NaN (like `pd.read_csv`) instead of None for missing text.
+
+    Arrow infers the type from the values, so an object column holding only numbers comes back as
+    floats: with `dtype`, the column gets its pandas dtype back.
+    """
+    series = pa.ipc.open_stream(buffer).read_all().column('values').to_pandas()
+
+    if series.dtype == object:
+        series = series.where(series.notna(), np.nan)
+
+    if dtype is not None and series.dtype != dtype:
+        series = series.astype(dtype)
+
+    return series
+
+
+def _clean_shard(function, shard, args):
+    """
+    Worker side: clean a shard of a column. The shard is either a pandas Series (pickled by the pool)
+    or the (name, size, dtype) of a shared memory block holding its Arrow IPC stream. The result goes
+    back as an Arrow IPC stream and its dtype when possible, as the stream unpickles as a single block
+    of bytes.
+    """
+    if isinstance(shard, tuple):
+        name, size, dtype = shard
+        memory = shared_memory.SharedMemory(name=name)
+
+        try:
+            # Copy the stream out of the block: a zero-copy column (e.g. of numbers) would still point
+            # into it, and the block can't be closed while anything does
+            with memory.buf[:size] as view:
+                stream = pa.py_buffer(bytes(view))
+        finally:
+            memory.close()
+
+        series = _from_arrow(stream, dtype)
+    else:
+        series = shard
+
+    result = function(series.reset_index(drop=True), *args)
+    stream = _to_arrow(result)
+
+    return result if stream is None else (stream, str(result.dtype))
+
+
+class ColumnExecutor:
+    """
+    Run the vectorized column cleaners of `cleaning_engine.py` on all cores.
+
+    A column is split into one contiguous shard per worker. Each shard is written to a shared memory
+    block as an Arrow IPC stream, which the worker maps without the whole column being pickled, and
+    the cleaned shards come back as Arrow streams and are put back together in their original order.
+    The result is the same as calling the cleaner on the whole column.
+
+    Columns that Arrow can't hold (e.g. numbers mixed with text), or every column when pyarrow is
+    not installed, are sent to the workers pickled. Columns shorter than `min_rows` are cleaned in
+    this process, where starting workers would cost more than it saves.
+
+    The cleaners take a fraction of a second per 100,000 rows, so the transfers are a large share of
+    the work: on a single core, 315,000 phone numbers take 0.52s in two workers against 0.37s in this
+    process. The default of one worker per core cleans in this process on single-core machines.
+    """
+
+    def __init__(self, max_workers=None, min_rows=100_000):
+        self.max_workers = max_workers or os.cpu_count()
+        self.min_rows = min_rows
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Shut the worker processes down (they are started again on the next parallel call)"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def clean(self, function, series, *args):
+        """`function(series, *args)`, run over shards of the series in the worker processes"""
+        if self.max_workers <= 1 or len(series) < self.min_rows:
+            return function(series, *args)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers)
+
+        bounds = np.linspace(0, len(series), self.max_workers + 1).astype(int)
+        blocks = []
+        futures = []
+
+        try:
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                shard = series.iloc[start:end]
+                stream = _to_arrow(shard)
+
+                if stream is not None:
+                    memory = shared_memory.SharedMemory(create=True, size=max(stream.size, 1))
+                    blocks.append(memory)
+                    memory.buf[:stream.size] = memoryview(stream).cast('B')
+                    shard = (memory.name, stream.size, str(shard.dtype))
+
+                futures.append(self._executor.submit(_clean_shard, function, shard, args))
+
+            results = [future.result() for future in futures]
+        finally:
+            for memory in blocks:
+                memory.close()
+                memory.unlink()
+
+        results = [_from_arrow(*result) if isinstance(result, tuple) else result for result in results]
+
+        cleaned = pd.concat(results, ignore_index=True)
+        cleaned.index = series.index
+        cleaned.name = series.name
+
+        return cleaned
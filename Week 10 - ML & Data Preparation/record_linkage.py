@@ -0,0 +1,232 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from cleaning_engine import WHITESPACE, clean_phone_numbers
+
+NON_LETTERS = r'[^a-z ]'
+
+# Columns compared between two candidate records, besides the name
+COMPARISON_COLUMNS = ['age', 'state', 'monthly_income', 'account_balance', 'phone_number', 'employment_type',
+                      'account_type', 'education_level', 'registration_date']
+
+
+def normalize_names(names):
+    """Lower-case names with only letters and single spaces: '  ADEBAYO  okafor. ' -> 'adebayo okafor'"""
+    return (names.fillna('').astype(str).str.lower()
+            .str.replace(NON_LETTERS, ' ', regex=True)
+            .str.replace(WHITESPACE, ' ', regex=True)
+            .str.strip())
+
+
+def name_keys(full_names):
+    """Name part of the blocking keys: the first name and the start of the last name ('adebayo oka'), NaN when empty"""
+    names = normalize_names(full_names)
+    parts = names.str.split(' ', n=1, expand=True).reindex(columns=[0, 1])
+
+    return (parts[0] + ' ' + parts[1].fillna('').str[:3]).where(names != '')
+
+
+def state_keys(states):
+    """State part of the blocking keys: the lower-case state, NaN when missing"""
+    return states.astype(str).str.lower().str.strip().where(states.notna())
+
+
+def combined_keys(left, right):
+    """
+    One number per distinct (left, right) pair of values, NaN when either is missing: the same groups
+    as joining the values into strings, but much faster to build and to group on.
+    """
+    left_codes, _ = pd.factorize(left)
+    right_codes, right_uniques = pd.factorize(right)
+    keys = left_codes.astype('int64') * (len(right_uniques) + 1) + right_codes
+
+    return np.where((left_codes < 0) | (right_codes < 0), np.nan, keys)
+
+
+def _apply(function, values):
+    return function(values)
+
+
+def _bigram_bits(name):
+    bits = 0
+
+    for start in range(len(name) - 1):
+        bits |= 1 << (zlib.crc32(name[start:start + 2].encode()) % 64)
+
+    return bits
+
+
+def name_bitsets(names):
+    """
+    64-bit set of the character bigrams of every name (each bigram hashed to one bit), computed once
+    per distinct name. Names are padded with a space, so first and last letters count too.
+    """
+    codes, uniques = pd.factorize(names)
+    bits = np.array([_bigram_bits(f' {name} ') for name in uniques], dtype='uint64')
+
+    return bits[codes]
+
+
+def bitset_similarity(left, right):
+    """Jaccard similarity of two arrays of bigram bitsets: shared bits over bits in either"""
+    union = np.bitwise_count(left | right).astype('float64')
+    shared = np.bitwise_count(left & right)
+
+    return np.divide(shared, union, out=np.zeros(len(union)), where=union > 0)
+
+
+def candidate_pairs(keys, max_block_size=100, split_keys=()):
+    """
+    Pairs of row positions (first < second) sharing a blocking key. Missing keys are never paired.
+
+    To keep the number of pairs near-linear, blocks larger than `max_block_size` are split on each of
+    the `split_keys` in turn (arrays with a value per row, e.g. the age for the blocks of a common
+    name), and the blocks still too large are skipped. Returns the pairs, and the blocking keys of the
+    skipped rows (indexed by row position).
+    """
+    rows = pd.DataFrame({'key': keys, 'position': np.arange(len(keys))}).dropna()
+
+    for split_key in split_keys:
+        sizes = rows['key'].map(rows['key'].value_counts())
+        large = (sizes > max_block_size).to_numpy()
+
+        if not large.any():
+            break
+
+        split = pd.Series(split_key, dtype=object).iloc[rows['position'][large]].astype(str).to_numpy()
+        rows['key'] = rows['key'].astype(object)
+        rows.loc[large, 'key'] = rows['key'][large].astype(str) + '|' + split
+
+    sizes = rows['key'].map(rows['key'].value_counts())
+    skipped = rows[sizes > max_block_size].set_index('position')['key']
+    rows = rows[(sizes > 1) & (sizes <= max_block_size)]
+
+    pairs = rows.merge(rows, on='key', suffixes=('_left', '_right'))
+    pairs = pairs[pairs['position_left'] < pairs['position_right']]
+
+    return pairs['position_left'].to_numpy(), pairs['position_right'].to_numpy(), skipped
+
+
+def connected_components(n, left, right):
+    """
+    Cluster label of each of the `n` rows, given pairs of matching rows (union-find by repeatedly
+    pointing every row to the smallest row of its pairs). The label is the first row of the cluster.
+    """
+    labels = np.arange(n)
+
+    while True:
+        smallest = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smallest)
+        np.minimum.at(updated, right, smallest)
+
+        # Path compression: point to the label of the label
+        updated = updated[updated]
+
+        if np.array_equal(updated, labels):
+            return labels
+
+        labels = updated
+
+
+class FuzzyDeduplicator:
+    """
+    Find customers recorded more than once under different IDs, with name or phone variations.
+
+    Records are only compared within blocks of likely duplicates: the same first name and start of the
+    last name, and the same phone number or state. Blocks of more than `max_block_size` records (e.g. a
+    common name in a large state) are split on the `split_columns`, and the records of the blocks still
+    too large are not compared: `skipped_blocks` and `skipped_rows` count them after each call.
+
+    Each candidate pair is scored from the similarity of the names (Jaccard similarity of bigram
+    bitsets) and the share of `comparison_columns` with the same value in both records, and pairs
+    scoring at least `threshold` are matches. Matches are grouped into clusters (a record matching two
+    others puts all three in one cluster), and the first record of each cluster is kept.
+
+    The features of every record (normalized name, parts of the blocking keys) only depend on one of
+    its columns. They are computed with `clean(function, column)`, e.g. `CleaningContext.clean`, so a
+    `RowCache` only computes them for the new and changed rows.
+    """
+
+    def __init__(self, threshold=0.8, name_weight=0.4, comparison_columns=None, max_block_size=100,
+                 split_columns=('age', 'registration_date')):
+        self.threshold = threshold
+        self.name_weight = name_weight
+        self.comparison_columns = comparison_columns or COMPARISON_COLUMNS
+        self.max_block_size = max_block_size
+        self.split_columns = split_columns
+        self.skipped_blocks = 0
+        self.skipped_rows = 0
+
+    def blocking_keys(self, df, clean=_apply):
+        """Blocking keys of every record: name + phone number and name + state (NaN when a part is missing)"""
+        name_key = clean(name_keys, df['full_name'])
+        phones = clean(clean_phone_numbers, df['phone_number'])
+        states = clean(state_keys, df['state'])
+
+        return [combined_keys(name_key, phones), combined_keys(name_key, states)]
+
+    def find_matches(self, df, clean=_apply):
+        """Scored candidate pairs of row positions, with the matches (score >= threshold) flagged"""
+        names = clean(normalize_names, df['full_name'])
+
+        split_keys = [df[column].to_numpy() for column in self.split_columns if column in df]
+        lefts, rights, skipped = zip(*(candidate_pairs(keys, self.max_block_size, split_keys)
+                                       for keys in self.blocking_keys(df, clean)))
+
+        self.skipped_blocks = sum(keys.nunique() for keys in skipped)
+        self.skipped_rows = len(pd.Index(np.concatenate([keys.index for keys in skipped])).unique())
+
+        pairs = pd.DataFrame({'left': np.concatenate(lefts), 'right': np.concatenate(rights)})
+        pairs = pairs.drop_duplicates().reset_index(drop=True)
+        left, right = pairs['left'].to_numpy(), pairs['right'].to_numpy()
+
+        bits = name_bitsets(names)
+        pairs['name_similarity'] = bitset_similarity(bits[left], bits[right])
+
+        columns = [column for column in self.comparison_columns if column in df]
+        same = np.zeros(len(pairs))
+        compared = np.zeros(len(pairs))
+
+        for column in columns:
+            values = df[column].to_numpy()
+            both = pd.notna(values[left]) & pd.notna(values[right])
+            same += both & (values[left] == values[right])
+            compared += both
+
+        pairs['field_agreement'] = np.divide(same, compared, out=np.zeros(len(pairs)), where=compared > 0)
+        pairs['score'] = (self.name_weight * pairs['name_similarity'] +
+                          (1 - self.name_weight) * pairs['field_agreement'])
+        pairs['match'] = pairs['score'] >= self.threshold
+
+        return pairs
+
+    def deduplicate(self, df, clean=_apply):
+        """
+        Drop the duplicates of every cluster of matching records, keeping the first record. Returns the
+        deduplicated frame and an audit frame of the clusters: one row per record, with its cluster
+        (the index of the kept record), whether it was kept, and its best score against the cluster.
+        """
+        pairs = self.find_matches(df, clean)
+        matches = pairs[pairs['match']]
+
+        labels = connected_components(len(df), matches['left'].to_numpy(), matches['right'].to_numpy())
+        keep = labels == np.arange(len(df))
+
+        in_cluster = ~keep | np.isin(np.arange(len(df)), labels[~keep])
+        positions = np.flatnonzero(in_cluster)
+
+        best_scores = pd.concat([
+            matches.groupby('left')['score'].max(),
+            matches.groupby('right')['score'].max(),
+        ]).groupby(level=0).max()
+
+        audit = df.iloc[positions][['customer_id', 'full_name', 'phone_number', 'state']].copy()
+        audit.insert(0, 'cluster', df.index[labels[positions]])
+        audit['kept'] = keep[positions]
+        audit['score'] = best_scores.reindex(positions).to_numpy()
+        audit = audit.sort_values(['cluster', 'kept'], ascending=[True, False], kind='stable')
+
+        return df[keep], audit
@@ -0,0 +1,233 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# Small, mergeable summaries of columns that are too large to hold in memory, updated one chunk of
+# values at a time.
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream of numbers in bounded memory (a KLL sketch).
+
+    Values are kept in levels of buffers. When a level is full it is sorted and every other value
+    (starting at a random offset) moves up one level, where it stands for twice as many values.
+    Lower levels get smaller buffers, so the sketch holds about `3 * k` values whatever the number
+    of values seen, and the rank error is about 1.7 / k of the count.
+
+    Until the first compaction (fewer than `k` values) the sketch holds every value and the quantiles
+    are exact, computed with the linear interpolation of `pd.Series.quantile`. NaN values are ignored,
+    like pandas does.
+    """
+
+    def __init__(self, k=2000, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        return max(2, math.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1)))
+
+    def _compact(self):
+        level = 0
+
+        while level < len(self.levels):
+            values = self.levels[level]
+
+            if len(values) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+
+                values = np.sort(values)
+
+                # With an odd count, the largest value stays on this level
+                kept = values[len(values) - len(values) % 2:]
+                promoted = values[self.rng.integers(2):len(values) - len(values) % 2:2]
+
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+            level += 1
+
+    def update(self, values):
+        """Add an array (or Series) of values"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+        return self
+
+    def merge(self, other):
+        """Add the values summarized by another sketch (e.g. the sketch of another chunk or process)"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+
+        self.count += other.count
+        self._compact()
+
+        return self
+
+    def quantile(self, q):
+        """Approximate `q` quantile (NaN when no value was added)"""
+        if not self.count:
+            return np.nan
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2 ** level) for level, values in enumerate(self.levels)])
+
+        order = np.argsort(values, kind='stable')
+        values, weights = values[order], weights[order]
+
+        # The value with weight w stands for w consecutive ranks, from `first` to `first + w - 1`
+        last = np.cumsum(weights) - 1
+        first = last - weights + 1
+
+        rank = q * (weights.sum() - 1)
+        position = np.searchsorted(last, rank, side='left')
+
+        if rank >= first[position] or position == 0:
+            return float(values[position])
+
+        # Between the last rank of the previous value and the first rank of this one
+        fraction = rank - last[position - 1]
+
+        return float(values[position - 1] + fraction * (values[position] - values[position - 1]))
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class SeenKeys:
+    """
+    The set of keys (e.g. customer IDs) seen so far in a stream of chunks, to drop duplicates across
+    chunks. Keys are stored as 64-bit hashes (8 bytes per distinct key).
+
+    The hashes are kept in sorted runs, each more than twice as long as the next one. The new keys of
+    a chunk make a new run, merged with the last runs until that holds again, so a hash is merged
+    about log2(n) times in all and there are at most log2(n) runs to search: the cost stays near-linear
+    in the number of keys, whatever the chunk size.
+
+    Two different keys are taken as duplicates only if their hashes collide, which has a probability
+    of about n² / 2^65 for n distinct keys (less than one in 10^5 for 10^7 keys).
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+    def first_seen(self, keys):
+        """
+        Boolean mask of the keys seen for the first time: neither in an earlier chunk nor earlier in
+        this chunk (like `~keys.duplicated(keep='first')`). The keys are then added to the set.
+        """
+        hashes = pd.util.hash_pandas_object(pd.Series(keys), index=False).to_numpy()
+        seen = np.zeros(len(hashes), dtype=bool)
+
+        for run in self.runs:
+            positions = np.searchsorted(run, hashes)
+            found = positions < len(run)
+            found[found] = run[positions[found]] == hashes[found]
+            seen |= found
+
+        first = ~seen & ~pd.Series(hashes).duplicated(keep='first').to_numpy()
+
+        run = np.sort(hashes[first])
+        while self.runs and len(self.runs[-1]) <= 2 * len(run):
+            # Both runs are sorted and share no hash: insert one into the other
+            last = self.runs.pop()
+            run = np.insert(last, np.searchsorted(last, run), run)
+
+        if len(run):
+            self.runs.append(run)
+
+        return first
+
+
+def _bit_length(values):
+    """Number of bits of each uint64 value (0 for 0), without going through floats"""
+    values = values.copy()
+    lengths = np.zeros(len(values), dtype='int64')
+
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = values >= np.uint64(1 << shift)
+        lengths[high] += shift
+        values[high] >>= np.uint64(shift)
+
+    return lengths + (values > 0)
+
+
+class HyperLogLog:
+    """
+    Approximate count of distinct values in a few KB (2^precision one-byte registers).
+
+    Every value is hashed to 64 bits: the first `precision` bits pick a register, which keeps the
+    highest number of leading zeros seen in the other bits. The standard error is 1.04 / sqrt(2^precision),
+    0.8% with the default precision. Up to `exact_limit` distinct values, the hashes themselves are kept
+    and the count is exact. Missing values are not counted, like `nunique()`.
+    """
+
+    def __init__(self, precision=14, exact_limit=10_000):
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype='uint8')
+        self.exact_limit = exact_limit
+        self.hashes = np.empty(0, dtype='uint64')
+
+    def update(self, values):
+        values = pd.Series(values).dropna()
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+        if self.hashes is not None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) > self.exact_limit:
+                self.hashes = None
+
+        self._add_hashes(hashes)
+
+        return self
+
+    def _add_hashes(self, hashes):
+        precision = np.uint64(self.precision)
+        registers = (hashes >> (np.uint64(64) - precision)).astype('int64')
+
+        # The remaining bits, with a guard bit so the rank is at most 64 - precision + 1
+        remaining = (hashes << precision) | np.uint64(1 << (self.precision - 1))
+        ranks = 64 - _bit_length(remaining) + 1
+
+        np.maximum.at(self.registers, registers, ranks.astype('uint8'))
+
+    def merge(self, other):
+        self.registers = np.maximum(self.registers, other.registers)
+
+        if self.hashes is not None and other.hashes is not None:
+            self.hashes = np.union1d(self.hashes, other.hashes)
+            if len(self.hashes) > self.exact_limit:
+                self.hashes = None
+        else:
+            self.hashes = None
+
+        return self
+
+    def count(self):
+        if self.hashes is not None:
+            return len(self.hashes)
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m ** 2 / np.sum(2.0 ** -self.registers.astype('float64'))
+
+        # Small counts: linear counting of the empty registers is more accurate
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+# The modules of the week and the data generators are imported by name, like the scripts do
+HERE = os.path.dirname(os.path.abspath(__file__))
+WEEK_DIRECTORY = os.path.dirname(HERE)
+sys.path[:0] = [WEEK_DIRECTORY, os.path.join(WEEK_DIRECTORY, '..', 'data')]
+
+
+@pytest.fixture(scope='session')
+def data_preparation():
+    """The `data-preparation.py` script, whose name is not a valid module name"""
+    path = os.path.join(WEEK_DIRECTORY, 'data-preparation.py')
+    spec = importlib.util.spec_from_file_location('data_preparation', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    return module
+
+
+@pytest.fixture(scope='session')
+def banking_csv(tmp_path_factory):
+    """A messy banking data file, with the column names of `banking_data.csv`"""
+    from generate_messy_banking_data import generate_messy_banking_data
+
+    df = generate_messy_banking_data(1_500, seed=11)
+    path = tmp_path_factory.mktemp('data') / 'banking_data.csv'
+    df.rename(columns={'employment_type': 'employment-type', 'registration_date': 'registration date'}).to_csv(path, index=False)
+
+    return path
@@ -0,0 +1,77 @@
+import json
+
+import pandas as pd
+import pytest
+
+from cleaning_engine import (clean_dates, clean_income_values, clean_loan_values, clean_phone_numbers,
+                             standardize_names, standardize_states)
+from cleaning_context import CleaningContext
+from cleaning_pipeline import CleaningPipeline
+
+# Values the generator doesn't produce, added to every column
+EDGE_CASES = [None, '', '   ', 'nan', '0', '-', '+2348012345678', '8012345678', '₦ 1,200.50', '12.7', 'NIL',
+              'Some', '31-12-2020', '2020/02/30', '  lagos ', 'Cross  RIVER', "o'brien  mc-donald"]
+
+
+@pytest.fixture(scope='module', params=['as read', 'with edge cases'])
+def raw(request, data_preparation, banking_csv):
+    """The raw data as `main` reads it (with the dtypes `read_csv` infers), or as text with the edge cases appended"""
+    df = data_preparation.load_banking_data(banking_csv)
+    df = df.rename(columns={'employment-type': 'employment_type', 'registration date': 'registration_date'})
+
+    if request.param == 'as read':
+        return df
+
+    edge_cases = pd.DataFrame({column: EDGE_CASES for column in df.columns})
+
+    return pd.concat([df.astype(object), edge_cases], ignore_index=True)
+
+
+# Per column: the per-value reference function of `data-preparation.py` and the vectorized function
+ENGINE_FUNCTIONS = {
+    'full_name': ('standardize_name', lambda values, module: standardize_names(values)),
+    'state': ('standardize_state', lambda values, module: standardize_states(values, module.STATES_MAP)),
+    'monthly_income': ('clean_income_value', lambda values, module: clean_income_values(values)),
+    'phone_number': ('clean_phone_number', lambda values, module: clean_phone_numbers(values)),
+    'previous_loans': ('clean_loan_value', lambda values, module: clean_loan_values(values)),
+    'registration_date': ('clean_date', lambda values, module: clean_dates(values, module.DATE_FORMATS)),
+}
+
+
+@pytest.mark.parametrize('column', ENGINE_FUNCTIONS)
+def test_engine_matches_the_per_value_functions(data_preparation, raw, column):
+    reference, engine = ENGINE_FUNCTIONS[column]
+
+    expected = raw[column].apply(getattr(data_preparation, reference))
+    actual = engine(raw[column], data_preparation)
+
+    pd.testing.assert_series_equal(actual, expected)
+
+
+def test_profile_is_the_same_whatever_the_chunk_size(data_preparation, banking_csv):
+    # The sketches are exact for small files (up to 2,000 values per column), so the profiles must be identical
+    def profile(chunksize):
+        # NaN != NaN, but the missing quantiles of two profiles are the same text
+        columns = data_preparation.banking_data_profile(banking_csv, chunksize=chunksize).report()['columns']
+        return {column: json.dumps(summary, default=str) for column, summary in columns.items()}
+
+    expected = profile(100_000)
+
+    for chunksize in (10, 50, 999):
+        assert profile(chunksize) == expected, f'chunksize={chunksize}'
+
+
+def test_chunked_cleaning_matches_the_whole_file(data_preparation, banking_csv, tmp_path):
+    # Without a deduplicator, the in-memory pipeline keeps the fuzzy duplicates too, and the sketches
+    # are exact for small files: the cleaned files must be identical
+    df = data_preparation.load_banking_data(banking_csv)
+    df = df.rename(columns={'employment-type': 'employment_type', 'registration date': 'registration_date'})
+
+    expected = tmp_path / 'expected.csv'
+    CleaningPipeline(data_preparation.CLEANING_STAGES, trace_memory=False).run(df, CleaningContext()).to_csv(expected, index=False)
+
+    for chunksize in (10, 333, 100_000):
+        output = tmp_path / f'chunks_{chunksize}.csv'
+        data_preparation.clean_banking_data_in_chunks(banking_csv, output, chunksize=chunksize)
+
+        assert output.read_text() == expected.read_text(), f'chunksize={chunksize}'
@@ -0,0 +1,50 @@
+import pandas as pd
+import pytest
+
+from cleaning_context import CleaningContext
+from cleaning_pipeline import CleaningPipeline
+from incremental_cleaning import RowCache
+from record_linkage import FuzzyDeduplicator
+
+
+@pytest.fixture(scope='module')
+def raw(data_preparation, banking_csv):
+    df = data_preparation.load_banking_data(banking_csv)
+    return df.rename(columns={'employment-type': 'employment_type', 'registration date': 'registration_date'})
+
+
+def run(data_preparation, df, row_cache):
+    context = CleaningContext(row_cache=row_cache, deduplicator=FuzzyDeduplicator())
+
+    if row_cache is not None:
+        row_cache.start(df)
+
+    cleaned = CleaningPipeline(data_preparation.CLEANING_STAGES, trace_memory=False).run(df, context)
+
+    return cleaned, context
+
+
+def test_warm_run_matches_a_full_run(data_preparation, raw, tmp_path):
+    manifest = str(tmp_path / 'manifest.pkl')
+
+    # The first run cleans every row, and remembers them
+    cold = RowCache(manifest)
+    run(data_preparation, raw, cold)
+    cold.save()
+
+    # A refreshed extract: every row but the last 100, a changed name, and new rows
+    refreshed = raw.iloc[:-100].copy()
+    refreshed.loc[5, 'full_name'] = '  ADEBAYO  okafor. '
+    refreshed = pd.concat([refreshed, raw.iloc[-50:].assign(customer_id=lambda df: df['customer_id'] + 'X')],
+                          ignore_index=True)
+
+    warm = RowCache(manifest)
+    cleaned, context = run(data_preparation, refreshed, warm)
+    expected, expected_context = run(data_preparation, refreshed, None)
+
+    pd.testing.assert_frame_equal(cleaned, expected)
+    pd.testing.assert_frame_equal(context.fuzzy_duplicates, expected_context.fuzzy_duplicates)
+
+    # Only the changed and new rows were cleaned (by every column cleaner and fuzzy feature that saw them)
+    assert warm.reused > 0
+    assert warm.cleaned <= 51 * len(warm.columns)
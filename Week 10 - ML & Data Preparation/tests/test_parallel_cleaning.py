@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cleaning_engine import (clean_income_values, clean_loan_values, clean_phone_numbers, standardize_names,
+                             standardize_states)
+from parallel_cleaning import ColumnExecutor
+
+ROWS = 4_000
+
+
+@pytest.fixture(scope='module')
+def executor():
+    # Two workers and a low `min_rows`, so every column below is cleaned in shards
+    with ColumnExecutor(max_workers=2, min_rows=1_000) as executor:
+        yield executor
+
+
+def columns():
+    rng = np.random.default_rng(0)
+    names = pd.Series(rng.choice(['  ADEBAYO okafor', 'grace  eze', 'Musa Bello', None], size=ROWS))
+    phones = pd.Series(rng.integers(10_000_000, 100_000_000, size=ROWS)).astype(str)
+
+    # The first half of the column (the first shard) only has missing values
+    half_missing = pd.Series(rng.integers(0, 500_000, size=ROWS).astype('float64'))
+    half_missing[:ROWS // 2] = np.nan
+
+    text_half_missing = pd.Series(rng.choice(['Lagos', 'ab.uj'], size=ROWS), dtype=object)
+    text_half_missing[:ROWS // 2] = np.nan
+
+    # Numbers in the first half and text in the second one: each shard has a single type
+    mixed = pd.Series(list(rng.integers(0, 6, size=ROWS // 2).astype('float64')) + ['Few'] * (ROWS // 2), dtype=object)
+
+    return {
+        'int': (clean_loan_values, pd.Series(rng.integers(0, 6, size=ROWS)), ()),
+        'float': (clean_income_values, pd.Series(rng.integers(0, 500_000, size=ROWS).astype('float64')), ()),
+        'float_half_missing': (clean_income_values, half_missing, ()),
+        'string_names': (standardize_names, names, ()),
+        'string_phones': (clean_phone_numbers, '080' + phones, ()),
+        'string_half_missing': (standardize_states, text_half_missing, ({'ab.uj': 'Abuja'},)),
+        'mixed': (clean_loan_values, mixed, ()),
+    }
+
+
+@pytest.mark.parametrize('column', columns())
+def test_parallel_output_is_the_serial_output(executor, column):
+    function, values, args = columns()[column]
+    values = values.set_axis(np.arange(ROWS) * 3).rename(column)
+
+    pd.testing.assert_series_equal(executor.clean(function, values, *args), function(values, *args))
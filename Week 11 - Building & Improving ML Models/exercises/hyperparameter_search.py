@@ -0,0 +1,258 @@
+import math
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn import config_context
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+from threadpoolctl import threadpool_limits
+
+from preprocessing_artifacts import CreditPreprocessing
+from roc_evaluation import RocCurves
+from scoring_service import PREPROCESSING_PATH
+
+# Model families of solution.py, with the values tried for their hyperparameters
+SEARCH_SPACES = {
+    'Logistic Regression': (LogisticRegression(random_state=42, max_iter=1000), {
+        'C': [0.01, 0.1, 1, 10, 100],
+    }),
+    'Decision Tree': (DecisionTreeClassifier(random_state=42), {
+        'max_depth': [3, 5, 10, None],
+        'min_samples_leaf': [1, 5, 20],
+        'criterion': ['gini', 'entropy'],
+    }),
+    'Random Forest': (RandomForestClassifier(random_state=42), {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [5, 10, None],
+        'max_features': ['sqrt', 0.5],
+    }),
+}
+
+# Families trained on scaled features (like Logistic Regression in solution.py)
+SCALED_FAMILIES = {'Logistic Regression'}
+
+# Folds, matrices and subsamples of the search, set once per worker process by `_set_data`
+_data = {}
+
+
+def _set_data(data):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _data.update(data)
+
+
+def _evaluate(estimator, params, scaled, fold, budget):
+    """
+    Worker side: fit a candidate (`estimator` with `params`) on `budget` training rows of a fold, scaled
+    or not, and score it on the validation rows (mean one-vs-rest ROC-AUC). Returns the score, the fit
+    time and the whole time.
+    """
+    start = time.perf_counter()
+    X_train, X_validation = _data['scaled' if scaled else 'raw'][fold]
+    y_train, y_validation = _data['targets'][fold]
+    rows = _data['subsamples'][fold, budget]
+
+    model = clone(estimator).set_params(**params)
+
+    # One thread per fit: the parallelism is across candidates and folds
+    with threadpool_limits(limits=1):
+        fit_start = time.perf_counter()
+        model.fit(X_train[rows], y_train[rows])
+        fit_seconds = time.perf_counter() - fit_start
+
+        probabilities = model.predict_proba(X_validation)
+
+    score = RocCurves(y_validation, probabilities, classes=model.classes_).mean_auc()
+
+    return score, fit_seconds, time.perf_counter() - start
+
+
+class HyperparameterSearch:
+    """
+    Successive halving over the hyperparameter grids of `search_spaces`, with stratified K-fold
+    cross-validation.
+
+    Every candidate is first trained on a small stratified sample of the training rows of each fold.
+    Only the best `1 / eta` candidates of each family move up to the next rung, which has `eta` times
+    more rows, until the last rung uses all the rows. Bad configurations are dropped after costing a
+    fraction of a full fit, and each family keeps its best candidates until the end, so the families
+    are compared at full budget. The first rung has at least `min_resources` rows.
+
+    The fold splits, the fold matrices (scaled once per fold for the families that need it) and the
+    stratified samples of every rung are computed once, before any candidate is trained, and sent
+    once to each worker process. The (candidate, fold) fits of a rung then run in parallel on
+    `max_workers` processes (one thread each), or in this process with a single core.
+    """
+
+    def __init__(self, search_spaces=None, n_splits=5, eta=3, min_resources=None, max_workers=None, seed=42):
+        self.search_spaces = search_spaces or SEARCH_SPACES
+        self.n_splits = n_splits
+        self.eta = eta
+        self.min_resources = min_resources
+        self.max_workers = max_workers or os.cpu_count()
+        self.seed = seed
+
+    def _prepare(self, X, y):
+        """Fold splits, fold matrices and the stratified samples of every rung"""
+        X = np.asarray(X, dtype='float64')
+        y = np.asarray(y)
+
+        # Every class needs a row in each fold
+        n_splits = max(2, min(self.n_splits, np.bincount(pd.factorize(y)[0]).min()))
+        folds = list(StratifiedKFold(n_splits, shuffle=True, random_state=self.seed).split(X, y))
+
+        raw, scaled, targets = [], [], []
+
+        # The fold matrices are indexed by row position, so the scaler must return arrays even when the
+        # caller asked for data frames (`set_config(transform_output='pandas')` in solution.py)
+        with config_context(transform_output='default'):
+            for train, validation in folds:
+                raw.append((X[train], X[validation]))
+                scaler = StandardScaler().fit(X[train])
+                scaled.append((scaler.transform(X[train]), scaler.transform(X[validation])))
+                targets.append((y[train], y[validation]))
+
+        # Rung budgets: the full training rows of the smallest fold, divided by eta for every rung below
+        n_rows = min(len(train) for train, _ in folds)
+        n_classes = len(np.unique(y))
+        min_resources = self.min_resources or 20 * n_classes
+        most_candidates = max(len(ParameterGrid(grid)) for _, grid in self.search_spaces.values())
+
+        # Another rung as long as it has enough rows, and there are candidates left to drop
+        n_rungs = 1
+        while n_rows // self.eta ** n_rungs >= min_resources and self.eta ** n_rungs < most_candidates:
+            n_rungs += 1
+
+        budgets = [n_rows // self.eta ** rung for rung in reversed(range(n_rungs))]
+
+        subsamples = {}
+        for fold, (train, _) in enumerate(folds):
+            for budget in budgets:
+                if budget >= len(train):
+                    subsamples[fold, budget] = np.arange(len(train))
+                else:
+                    rows, _ = train_test_split(np.arange(len(train)), train_size=budget,
+                                               stratify=y[train], random_state=self.seed)
+                    subsamples[fold, budget] = np.sort(rows)
+
+        data = {'raw': raw, 'scaled': scaled, 'targets': targets, 'subsamples': subsamples}
+
+        return data, budgets, n_splits
+
+    def run(self, X, y):
+        """Search every family, and return the leaderboard: one row per candidate and rung it was trained on"""
+        start = time.perf_counter()
+        data, budgets, n_splits = self._prepare(X, y)
+        print(f"Prepared {n_splits} stratified folds and {len(budgets)} rungs "
+              f"({', '.join(f'{budget:,}' for budget in budgets)} training rows) "
+              f"in {time.perf_counter() - start:.2f}s")
+
+        candidates = {family: list(ParameterGrid(grid)) for family, (_, grid) in self.search_spaces.items()}
+        trials = []
+        executor = None
+
+        if self.max_workers > 1:
+            executor = ProcessPoolExecutor(self.max_workers, initializer=_set_data, initargs=(data,))
+        else:
+            _data.update(data)
+
+        try:
+            for rung, budget in enumerate(budgets):
+                rung_start = time.perf_counter()
+                tasks = [(family, params, fold)
+                         for family, family_candidates in candidates.items()
+                         for params in family_candidates
+                         for fold in range(n_splits)]
+
+                arguments = [(self.search_spaces[family][0], params, family in SCALED_FAMILIES, fold, budget)
+                             for family, params, fold in tasks]
+
+                if executor is not None:
+                    futures = [executor.submit(_evaluate, *task_arguments) for task_arguments in arguments]
+                    results = [future.result() for future in futures]
+                else:
+                    results = [_evaluate(*task_arguments) for task_arguments in arguments]
+
+                rung_trials = self._trials(tasks, results, n_splits, rung, budget)
+                trials += rung_trials
+
+                print(f"Rung {rung + 1}/{len(budgets)}: {len(rung_trials)} candidates x {n_splits} folds "
+                      f"on {budget:,} rows in {time.perf_counter() - rung_start:.2f}s")
+
+                # The best 1 / eta of each family move up to the next rung (the first in the grid on equal scores)
+                if rung + 1 < len(budgets):
+                    candidates = {}
+
+                    for family, family_trials in pd.DataFrame(rung_trials).groupby('family', sort=False):
+                        kept = max(1, math.ceil(len(family_trials) / self.eta))
+                        best = family_trials.sort_values('mean_score', ascending=False, kind='stable')
+                        candidates[family] = list(best['params'].head(kept))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            else:
+                _data.clear()
+
+        leaderboard = pd.DataFrame(trials)
+        leaderboard['params'] = leaderboard['params'].map(
+            lambda params: ', '.join(f'{key}={value}' for key, value in params.items()))
+        leaderboard = leaderboard.sort_values(['rung', 'mean_score'], ascending=False, kind='stable', ignore_index=True)
+
+        print(f"Search completed in {time.perf_counter() - start:.2f}s")
+
+        return leaderboard
+
+    def _trials(self, tasks, results, n_splits, rung, budget):
+        """One leaderboard row per candidate, from the results of its folds (tasks are grouped by candidate)"""
+        trials = []
+
+        for first in range(0, len(tasks), n_splits):
+            family, params, _ = tasks[first]
+            scores, fit_seconds, seconds = np.array(results[first:first + n_splits]).T
+
+            trials.append({
+                'family': family,
+                'params': params,
+                'rung': rung + 1,
+                'training_rows': budget,
+                'mean_score': scores.mean(),
+                'std_score': scores.std(),
+                'fit_seconds': fit_seconds.sum(),
+                'trial_seconds': seconds.sum(),
+            })
+
+        return trials
+
+
+def main():
+    df = pd.read_csv('../../data/credit_scoring.csv')
+
+    # The fills and encoders of solution.py, fitted again only if the data changed
+    preprocessing = CreditPreprocessing.load(PREPROCESSING_PATH, df)
+    if preprocessing is None:
+        preprocessing = CreditPreprocessing('repayment_status', id_columns=['customer_id']).fit(df)
+
+    df_clean = preprocessing.transform(df)
+    X = preprocessing.features(df_clean)
+    y = preprocessing.encode_target(df_clean['repayment_status'])
+
+    leaderboard = HyperparameterSearch().run(X, y)
+
+    print("\nLEADERBOARD (mean ROC-AUC over the folds, best first):")
+    print(leaderboard.head(15).round(4).to_string())
+
+    print("\nBest settings per model:")
+    print(leaderboard.drop_duplicates('family').round(4).to_string())
+
+    leaderboard.to_csv('hyperparameter_leaderboard.csv', index=False)
+    print("Leaderboard saved to 'hyperparameter_leaderboard.csv'")
+
+if __name__ == '__main__':
+    main()
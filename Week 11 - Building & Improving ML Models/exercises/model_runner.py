@@ -0,0 +1,140 @@
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from sklearn import config_context, get_config
+from threadpoolctl import threadpool_limits
+
+
+def _ignore_interrupts():
+    """Worker initializer: Ctrl+C is handled by the main process, which stops the workers cleanly"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _fit_and_predict(model, X_train, y_train, X_test, cores, config):
+    """
+    Worker side: fit a model and predict the test set, with BLAS and OpenMP limited to the
+    `cores` granted to the model (`n_jobs` is already set to them for the models that have it).
+    """
+    with config_context(**config), threadpool_limits(limits=cores):
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        y_pred = model.predict(X_test)
+        y_pred_proba = model.predict_proba(X_test)
+
+    return model, y_pred, y_pred_proba, fit_seconds
+
+
+def requested_cores(model, max_cores):
+    """Cores a model would use on its own: its `n_jobs` (-1 for all cores, None for one), capped at `max_cores`"""
+    n_jobs = model.get_params().get('n_jobs')
+
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, max_cores + 1 + n_jobs)
+
+    return max(1, min(n_jobs, max_cores))
+
+
+class ModelRunner:
+    """
+    Fit and score several models at the same time, one worker process per model.
+
+    Scheduling is `n_jobs`-aware, so the cores are shared rather than oversubscribed: the models are
+    started in order, each getting the cores it asks for (see `requested_cores`) out of those still
+    free, and at least one. A model with an `n_jobs` parameter (e.g. Random Forest) has it set to the
+    cores it got, so with 4 cores Logistic Regression and Decision Tree take one each and Random
+    Forest's `n_jobs=-1` builds its trees on the other two. Models waiting for a core start when
+    another model finishes. The fitted models are returned with their original `n_jobs`, and the
+    results are the same as fitting the models one after another.
+
+    With a single core, the models are fitted one after another in this process.
+    """
+
+    def __init__(self, max_cores=None):
+        self.max_cores = max_cores or os.cpu_count()
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Cancel the models not started yet and wait for the running ones, then stop the workers"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def run(self, tasks):
+        """
+        Fit and score the models of `tasks`, a dict of name -> (model, X_train, y_train, X_test).
+
+        Returns a dict of name -> {'model', 'y_pred', 'y_pred_proba', 'fit_seconds', 'cores'}, in the
+        order of `tasks` whatever the order the models finished in.
+        """
+        config = get_config()
+
+        if self.max_cores <= 1:
+            results = {}
+
+            for name, (model, X_train, y_train, X_test) in tasks.items():
+                print(f"Training {name} (1 core)...")
+                results[name] = self._result(_fit_and_predict(model, X_train, y_train, X_test, 1, config), 1)
+                print(f"{name} training completed in {results[name]['fit_seconds']:.2f}s!")
+
+            return results
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(min(self.max_cores, len(tasks)), initializer=_ignore_interrupts)
+
+        pending = list(tasks)
+        running = {}
+        results = {}
+        n_jobs = {name: tasks[name][0].get_params().get('n_jobs') for name in tasks}
+        free_cores = self.max_cores
+
+        while pending or running:
+            while pending and free_cores > 0:
+                name = pending.pop(0)
+                model, X_train, y_train, X_test = tasks[name]
+
+                cores = min(requested_cores(model, self.max_cores), free_cores)
+                if 'n_jobs' in model.get_params():
+                    model.set_params(n_jobs=cores)
+
+                print(f"Training {name} ({cores} core{'s' if cores > 1 else ''})...")
+                future = self._executor.submit(_fit_and_predict, model, X_train, y_train, X_test, cores, config)
+                running[future] = name, cores
+                free_cores -= cores
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, cores = running.pop(future)
+                free_cores += cores
+                results[name] = self._result(future.result(), cores)
+
+                if 'n_jobs' in results[name]['model'].get_params():
+                    tasks[name][0].set_params(n_jobs=n_jobs[name])
+                    results[name]['model'].set_params(n_jobs=n_jobs[name])
+
+                print(f"{name} training completed in {results[name]['fit_seconds']:.2f}s!")
+
+        return {name: results[name] for name in tasks}
+
+    def _result(self, result, cores):
+        model, y_pred, y_pred_proba, fit_seconds = result
+
+        return {
+            'model': model,
+            'y_pred': y_pred,
+            'y_pred_proba': y_pred_proba,
+            'fit_seconds': fit_seconds,
+            'cores': cores,
+        }
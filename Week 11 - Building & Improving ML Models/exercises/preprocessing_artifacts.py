@@ -0,0 +1,126 @@
+import hashlib
+import os
+import pickle
+
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+# Bump when the preprocessing steps change, so artifacts fitted by older code are refitted
+ARTIFACTS_VERSION = 1
+
+
+def data_hash(df):
+    """Content hash of a data frame: its column names, dtypes and values"""
+    digest = hashlib.sha256()
+    digest.update(repr([(column, str(dtype)) for column, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()
+
+
+class CreditPreprocessing:
+    """
+    The fitted preprocessing of the credit-scoring data, saved so that it is fitted once: the fill
+    value of every column (median of the numbers, mode of the others), a `LabelEncoder` per
+    categorical feature and for the target, the order of the feature columns, and the
+    `StandardScaler` of the training features.
+
+    The artifacts are saved with a content hash of the data they were fitted on. `load` returns
+    them only when the data is unchanged (so retraining on the same data skips the fitting), or
+    without a data frame for inference, where `transform` and `scale` prepare new applications
+    exactly like the training data. Categories not seen in training are encoded like the most
+    frequent category.
+    """
+
+    def __init__(self, target_column, id_columns=()):
+        self.target_column = target_column
+        self.id_columns = list(id_columns)
+        self.fills = {}
+        self.label_encoders = {}
+        self.target_encoder = None
+        self.feature_columns = None
+        self.scaler = None
+        self.data_hash = None
+
+    def fit(self, df):
+        """Fit the fill values and the encoders on the whole data set (the scaler is fitted with `fit_scaler`)"""
+        # For numerical columns: fill with median (robust to outliers)
+        # For categorical columns: fill with mode (most frequent value)
+        for column in df.columns:
+            if df[column].dtype in ['int64', 'float64']:
+                self.fills[column] = df[column].median()
+                print(f"Filled missing values in {column} with median: {self.fills[column]:.2f}")
+            else:
+                mode = df[column].mode()
+                self.fills[column] = mode[0] if not mode.empty else 'Unknown'
+                print(f"Filled missing values in {column} with mode: {self.fills[column]}")
+
+        filled = df.fillna(self.fills)
+
+        for column in filled.select_dtypes(include=['object']).columns:
+            if column != self.target_column:  # Don't encode the target variable yet
+                self.label_encoders[column] = LabelEncoder().fit(filled[column].astype(str))
+                print(f"Encoded categorical column: {column}")
+
+        self.target_encoder = LabelEncoder().fit(filled[self.target_column].astype(str))
+        self.feature_columns = [column for column in df.columns
+                                if column != self.target_column and column not in self.id_columns]
+        self.data_hash = data_hash(df)
+
+        return self
+
+    def fit_scaler(self, X_train):
+        self.scaler = StandardScaler().fit(X_train)
+
+        return self
+
+    def transform(self, df):
+        """Fill the missing values and encode the categorical columns (the target, if any, is only filled)"""
+        df = df.fillna({column: fill for column, fill in self.fills.items() if column in df})
+
+        for column, encoder in self.label_encoders.items():
+            if column in df:
+                codes = pd.Index(encoder.classes_).get_indexer(df[column].astype(str))
+                unseen = codes == -1
+
+                if unseen.any():
+                    codes[unseen] = encoder.transform([str(self.fills[column])])[0]
+
+                df[column] = codes
+
+        return df
+
+    def features(self, df):
+        """The feature columns of transformed data, in the training order"""
+        return df[self.feature_columns]
+
+    def encode_target(self, y):
+        return self.target_encoder.transform(y.astype(str))
+
+    def scale(self, X):
+        return self.scaler.transform(X)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            pickle.dump({'version': ARTIFACTS_VERSION, 'artifacts': self}, file)
+
+        return path
+
+    @classmethod
+    def load(cls, path, df=None):
+        """
+        The artifacts saved at `path`, or None when there are none, they were saved by another
+        version, or (when `df` is given) they were fitted on different data.
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'rb') as file:
+            saved = pickle.load(file)
+
+        if saved['version'] != ARTIFACTS_VERSION:
+            return None
+        if df is not None and saved['artifacts'].data_hash != data_hash(df):
+            return None
+
+        return saved['artifacts']
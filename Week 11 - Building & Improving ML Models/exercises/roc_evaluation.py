@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def _sorted_roc_curve(labels, scores):
+    """
+    ROC curve of binary `labels` (True for the positive class) with their `scores`, both sorted by
+    decreasing score. Same points as `sklearn.metrics.roc_curve` (collinear points are dropped).
+    """
+    # One point per distinct score, counting the positives and negatives scored at least as high
+    threshold_indices = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+    tps = np.cumsum(labels, dtype='float64')[threshold_indices]
+    fps = 1 + threshold_indices - tps
+    thresholds = scores[threshold_indices]
+
+    if len(fps) > 2:
+        corners = np.flatnonzero(np.r_[True, np.logical_or(np.diff(fps, 2), np.diff(tps, 2)), True])
+        fps, tps, thresholds = fps[corners], tps[corners], thresholds[corners]
+
+    fps, tps, thresholds = np.r_[0, fps], np.r_[0, tps], np.r_[np.inf, thresholds]
+
+    return fps / fps[-1], tps / tps[-1], thresholds
+
+
+def curve_auc(fpr, tpr):
+    """Area under a ROC curve (trapezoidal rule, like `sklearn.metrics.auc`)"""
+    return float(np.trapezoid(tpr, fpr))
+
+
+class RocCurves:
+    """
+    One-vs-rest ROC curves and AUCs of a multi-class model, computed once and kept for both the
+    metrics table and the plots.
+
+    `y_score` holds one column of probabilities per class (as returned by `predict_proba`), for the
+    `classes` in that order (0, 1, 2... by default, like label-encoded targets). All the scores are
+    sorted once, as a single array: that order is the micro-average curve (every class and row
+    pooled), and the scores of each class come out of it already in order for the per-class curves.
+    Classes absent from `y_true` (or present in every row) have no curve and are left out.
+
+    - `fpr`, `tpr`, `auc`: dicts with the per-class curves and AUCs (keyed by column index), plus
+      'micro' and 'macro', the average of the per-class curves interpolated on all their false
+      positive rates
+    - `mean_auc()`: the macro ROC-AUC of the metrics table, the mean of the per-class AUCs
+    """
+
+    def __init__(self, y_true, y_score, classes=None):
+        y_true = np.asarray(y_true)
+        y_score = np.asarray(y_score, dtype='float64')
+        n_rows, n_classes = y_score.shape
+        self.classes = np.arange(n_classes) if classes is None else np.asarray(classes)
+
+        self.fpr = {}
+        self.tpr = {}
+        self.auc = {}
+
+        # Position of every score in the flattened (row-major) matrix, by decreasing score. The order
+        # of equal scores doesn't matter: they make a single point of the curves
+        scores = y_score.ravel()
+        order = np.argsort(scores)[::-1]
+        is_positive = (y_true[:, np.newaxis] == self.classes).ravel()
+
+        # Every class has one score per row, so a stable sort of the classes (a radix sort, on small
+        # integers) gives a row of positions per class, still by decreasing score
+        column = (order % n_classes).astype(np.min_scalar_type(n_classes - 1))
+        by_class = order[np.argsort(column, kind='stable')].reshape(n_classes, n_rows)
+
+        for i, positions in enumerate(by_class):
+            labels = is_positive[positions]
+
+            if labels.all() or not labels.any():
+                continue
+
+            self.fpr[i], self.tpr[i], _ = _sorted_roc_curve(labels, scores[positions])
+            self.auc[i] = curve_auc(self.fpr[i], self.tpr[i])
+
+        if not self.auc:
+            return
+
+        self.fpr['micro'], self.tpr['micro'], _ = _sorted_roc_curve(is_positive[order], scores[order])
+        self.auc['micro'] = curve_auc(self.fpr['micro'], self.tpr['micro'])
+
+        class_curves = list(self.class_aucs())
+        all_fpr = np.unique(np.concatenate([self.fpr[i] for i in class_curves]))
+        mean_tpr = np.zeros_like(all_fpr)
+
+        for i in class_curves:
+            mean_tpr += np.interp(all_fpr, self.fpr[i], self.tpr[i])
+
+        mean_tpr /= len(class_curves)
+
+        self.fpr['macro'], self.tpr['macro'] = all_fpr, mean_tpr
+        self.auc['macro'] = curve_auc(all_fpr, mean_tpr)
+
+    def class_aucs(self):
+        """AUC of each class with a curve, keyed by column index"""
+        return {key: value for key, value in self.auc.items() if key not in ('micro', 'macro')}
+
+    def mean_auc(self):
+        """Mean of the per-class AUCs (0.0 when no class has a curve)"""
+        aucs = list(self.class_aucs().values())
+
+        return float(np.mean(aucs)) if aucs else 0.0
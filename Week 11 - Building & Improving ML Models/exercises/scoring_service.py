@@ -0,0 +1,332 @@
+import json
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+from sklearn import config_context
+
+from preprocessing_artifacts import CreditPreprocessing
+
+# Bump when the saved model bundle changes
+MODEL_VERSION = 1
+
+MODEL_PATH = '../../data/credit_model.pkl'
+PREPROCESSING_PATH = '../../data/credit_preprocessing.pkl'
+
+
+def save_model(path, name, model, scaled):
+    """Save a trained model for scoring, with whether it takes scaled features (like Logistic Regression)"""
+    with open(path, 'wb') as file:
+        pickle.dump({'version': MODEL_VERSION, 'name': name, 'model': model, 'scaled': scaled}, file)
+
+    return path
+
+
+class CreditScorer:
+    """
+    Score loan applications with the model and preprocessing saved by `solution.py`.
+
+    `score` takes a frame of applications (the columns of `credit_scoring.csv`, the repayment status
+    being optional) and returns their ID, the predicted repayment status and the probability of each
+    status. Applications are scored as whole batches: the preprocessing and the model are vectorized,
+    so scoring 10,000 applications at once costs little more than scoring one.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, preprocessing_path=PREPROCESSING_PATH):
+        with open(model_path, 'rb') as file:
+            bundle = pickle.load(file)
+
+        if bundle['version'] != MODEL_VERSION:
+            raise ValueError(f'{model_path} was saved by another version, train the model again')
+
+        self.name = bundle['name']
+        self.model = bundle['model']
+        self.scaled = bundle['scaled']
+        self.preprocessing = CreditPreprocessing.load(preprocessing_path)
+
+        if self.preprocessing is None:
+            raise ValueError(f'No preprocessing saved in {preprocessing_path}, train the model again')
+
+        self.statuses = self.preprocessing.target_encoder.inverse_transform(self.model.classes_)
+        self.probability_columns = [f"p_{status.lower().replace(' ', '_')}" for status in self.statuses]
+
+    def score(self, applications):
+        # Missing fields are filled like missing values, so an application scores the same alone or in a batch
+        missing = [column for column in self.preprocessing.feature_columns if column not in applications]
+        features = applications.assign(**{column: float('nan') for column in missing})
+
+        # The models were trained on data frames (see `set_config` in solution.py)
+        with config_context(transform_output='pandas'):
+            X = self.preprocessing.features(self.preprocessing.transform(features))
+
+            if self.scaled:
+                X = self.preprocessing.scale(X)
+
+            probabilities = self.model.predict_proba(X)
+
+        ids = [column for column in self.preprocessing.id_columns if column in applications]
+        scores = applications[ids].reset_index(drop=True)
+        scores['predicted_status'] = self.statuses[probabilities.argmax(axis=1)]
+        scores[self.probability_columns] = probabilities
+
+        return scores
+
+
+def _read_batches(path, batch_size):
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=batch_size)
+
+
+def score_file(scorer, input_path, output_path, batch_size=100_000):
+    """
+    Score the applications of a CSV (or `.parquet`) file into another, one batch of rows at a time,
+    so files of any size are scored with the memory of a single batch.
+    """
+    is_parquet = os.path.splitext(output_path)[1].lower() == '.parquet'
+    writer = None
+    rows = 0
+    start = time.perf_counter()
+
+    for batch in _read_batches(input_path, batch_size):
+        scores = scorer.score(batch)
+
+        if is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(scores, preserve_index=False)
+            writer = writer or pq.ParquetWriter(output_path, table.schema)
+            writer.write_table(table)
+        else:
+            scores.to_csv(output_path, index=False, mode='w' if rows == 0 else 'a', header=rows == 0)
+
+        rows += len(scores)
+
+    if writer:
+        writer.close()
+
+    print(f'Scored {rows:,} applications in {time.perf_counter() - start:.2f}s, saved to {output_path}',
+          file=sys.stderr)
+
+    return output_path
+
+
+class MicroBatcher:
+    """
+    Score requests arriving one at a time (e.g. from concurrent HTTP clients) in batches.
+
+    `submit` queues the applications of a request and returns a `Future` of their scores. A single
+    thread takes the first waiting request, adds the requests arriving within `max_wait` seconds (up to
+    `max_batch_size` applications), and scores them together. Under load a request waits at most
+    `max_wait` for others, while the model is called far less often than once per request. If a batch
+    fails (e.g. one request has invalid values), its requests are scored one by one, so only the
+    invalid request gets the error.
+    """
+
+    def __init__(self, scorer, max_batch_size=1000, max_wait=0.005):
+        self.scorer = scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Score the requests already submitted, then stop the batching thread"""
+        self._requests.put(None)
+        self._thread.join()
+
+    def submit(self, applications):
+        """Scores of a list of applications (dicts), as a `Future` of a data frame"""
+        future = Future()
+        self._requests.put((applications, future))
+
+        return future
+
+    def _run(self):
+        closing = False
+
+        while not closing:
+            request = self._requests.get()
+            if request is None:
+                return
+
+            batch = [request]
+            size = len(request[0])
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch_size:
+                try:
+                    request = self._requests.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    closing = True
+                    break
+
+                batch.append(request)
+                size += len(request[0])
+
+            self._score(batch)
+
+    def _score(self, batch):
+        applications = [application for request, _ in batch for application in request]
+
+        try:
+            scores = self.scorer.score(pd.DataFrame.from_records(applications))
+        except Exception as error:
+            if len(batch) == 1:
+                batch[0][1].set_exception(error)
+            else:
+                for request in batch:
+                    self._score([request])
+            return
+
+        start = 0
+        for request, future in batch:
+            future.set_result(scores.iloc[start:start + len(request)].reset_index(drop=True))
+            start += len(request)
+
+
+def _records(scores):
+    return json.loads(scores.to_json(orient='records'))
+
+
+def serve_stdin(scorer, **options):
+    """
+    Score JSON lines from stdin to stdout: each line is an application (a JSON object) or a list of
+    them, and gets a line with its scores, in the same order. Lines are micro-batched like HTTP requests.
+    """
+    pending = queue.Queue()
+
+    def write_results():
+        while (item := pending.get()) is not None:
+            future, is_list = item
+
+            try:
+                scores = _records(future.result())
+                line = json.dumps(scores if is_list else scores[0])
+            except Exception as error:
+                line = json.dumps({'error': str(error)})
+
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    writer = threading.Thread(target=write_results)
+    writer.start()
+
+    with MicroBatcher(scorer, **options) as batcher:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as error:
+                failed = Future()
+                failed.set_exception(error)
+                pending.put((failed, False))
+                continue
+
+            is_list = isinstance(request, list)
+            pending.put((batcher.submit(request if is_list else [request]), is_list))
+
+    pending.put(None)
+    writer.join()
+
+
+class ScoringServer(ThreadingHTTPServer):
+    # Many clients may connect at once: with the default backlog of 5, the others are retried a second later
+    request_queue_size = 128
+
+
+def serve_http(scorer, host='127.0.0.1', port=8000, **options):
+    """
+    Score applications posted as JSON (an object or a list of objects) to http://host:port/score, one
+    thread per connection, with the requests micro-batched. GET /health reports the model in use.
+    """
+    batcher = MicroBatcher(scorer, **options)
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            content = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'status': 'ok', 'model': scorer.name})
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._reply(404, {'error': 'not found'})
+                return
+
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                is_list = isinstance(request, list)
+                scores = _records(batcher.submit(request if is_list else [request]).result())
+            except Exception as error:
+                self._reply(400, {'error': str(error)})
+                return
+
+            self._reply(200, scores if is_list else scores[0])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ScoringServer((host, port), ScoringHandler)
+    print(f'Scoring with {scorer.name} on http://{host}:{port}/score (Ctrl+C to stop)', file=sys.stderr)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+
+def main():
+    # python scoring_service.py                          score ../../data/credit_scoring.csv
+    # python scoring_service.py batch INPUT OUTPUT       score a CSV or Parquet file into another
+    # python scoring_service.py stdin                    score JSON lines from stdin
+    # python scoring_service.py http [PORT]              serve http://127.0.0.1:PORT/score
+    mode, arguments = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ('batch', [])
+    scorer = CreditScorer()
+
+    if mode == 'batch':
+        input_path, output_path = arguments or ('../../data/credit_scoring.csv', '../../data/credit_scores.csv')
+        score_file(scorer, input_path, output_path)
+    elif mode == 'stdin':
+        serve_stdin(scorer)
+    elif mode == 'http':
+        serve_http(scorer, port=int(arguments[0]) if arguments else 8000)
+    else:
+        print(f'Unknown mode {mode!r}, expected batch, stdin or http', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
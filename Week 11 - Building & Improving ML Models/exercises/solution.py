@@ -4,19 +4,23 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn import set_config
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.linear_model import LogisticRegression
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (accuracy_score, precision_score, recall_score,
                              f1_score, confusion_matrix, classification_report)
-from sklearn.preprocessing import label_binarize
-from sklearn.metrics import roc_curve, auc
 from itertools import cycle
 import warnings
+
+from model_runner import ModelRunner
+from preprocessing_artifacts import CreditPreprocessing
+from roc_evaluation import RocCurves
+from scoring_service import MODEL_PATH, PREPROCESSING_PATH, save_model
+
 warnings.filterwarnings('ignore')
 
 set_config(transform_output="pandas")
+
 def main():
     # ================================================================
     # STEP 1: LOAD AND EXPLORE THE DATA
@@ -47,40 +51,25 @@ def main():
     print("\n" + "="*50)
     print("STEP 2: Preparing the data for modeling...")
 
-    # Make a copy of the original data for safety
-    df_clean = df.copy()
-
-    # Handle missing values
-    # For numerical columns: fill with median (robust to outliers)
-    # For categorical columns: fill with mode (most frequent value)
-    for column in df_clean.columns:
-        if df_clean[column].dtype in ['int64', 'float64']:
-            # Numerical column - fill with median
-            df_clean[column].fillna(df_clean[column].median(), inplace=True)
-            print(f"Filled missing values in {column} with median: {df_clean[column].median():.2f}")
-        else:
-            # Categorical column - fill with mode
-            mode_value = df_clean[column].mode()[0] if not df_clean[column].mode().empty else 'Unknown'
-            df_clean[column].fillna(mode_value, inplace=True)
-            print(f"Filled missing values in {column} with mode: {mode_value}")
-
     # Our target variable is 'repayment_status' with 3 classes:
     # - 'On Time': Customer paid the loan on schedule
     # - 'Delayed': Customer was late with payments but eventually paid
     # - 'Defaulted': Customer failed to repay the loan
     target_column = 'repayment_status'
 
-    # Encode categorical variables
-    # We'll use Label Encoding for simplicity (beginners can understand this easily)
-    label_encoders = {}
-    categorical_columns = df_clean.select_dtypes(include=['object']).columns
+    # Handle missing values and encode categorical variables
+    # Missing values are filled with the median (numbers) or the mode (categories), and categories
+    # are label encoded for simplicity (beginners can understand this easily)
+    # The fitted fills and encoders are saved with a hash of the data, and reused while the data
+    # doesn't change (see preprocessing_artifacts.py)
+    preprocessing = CreditPreprocessing.load(PREPROCESSING_PATH, df)
 
-    for column in categorical_columns:
-        if column != target_column:  # Don't encode the target variable yet
-            le = LabelEncoder()
-            df_clean[column] = le.fit_transform(df_clean[column].astype(str))
-            label_encoders[column] = le
-            print(f"Encoded categorical column: {column}")
+    if preprocessing is None:
+        preprocessing = CreditPreprocessing(target_column, id_columns=['customer_id']).fit(df)
+    else:
+        print(f"Data unchanged, reusing the preprocessing saved in {PREPROCESSING_PATH}")
+
+    df_clean = preprocessing.transform(df)
 
     print(f"\nAfter preprocessing, dataset shape: {df_clean.shape}")
 
@@ -93,7 +82,7 @@ def main():
 
     # Separate features (X) and target (y)
     # Remove customer_id as it's just an identifier, not a predictive feature
-    X = df_clean.drop(columns=[target_column, 'customer_id'])
+    X = preprocessing.features(df_clean)
     y = df_clean[target_column]
 
     print(f"Target variable: {target_column}")
@@ -101,8 +90,8 @@ def main():
     print(f"This is a MULTI-CLASS classification problem with 3 classes")
 
     # Encode target variable
-    le_target = LabelEncoder()
-    y_encoded = le_target.fit_transform(y.astype(str))
+    le_target = preprocessing.target_encoder
+    y_encoded = preprocessing.encode_target(y)
     print(f"\nTarget encoding:")
     for i, class_name in enumerate(le_target.classes_):
         print(f"  {class_name} → {i}")
@@ -134,9 +123,12 @@ def main():
 
     # Scale the features (important for Logistic Regression)
     # Decision Tree and Random Forest don't require scaling, but it doesn't hurt
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    if preprocessing.scaler is None:
+        preprocessing.fit_scaler(X_train)
+        preprocessing.save(PREPROCESSING_PATH)
+
+    X_train_scaled = preprocessing.scale(X_train)
+    X_test_scaled = preprocessing.scale(X_test)
 
     print("Features scaled using StandardScaler")
 
@@ -152,34 +144,26 @@ def main():
     models = {
         'Logistic Regression': LogisticRegression(random_state=42, max_iter=1000, multi_class='ovr'),
         'Decision Tree': DecisionTreeClassifier(random_state=42, max_depth=10),
-        'Random Forest': RandomForestClassifier(random_state=42, n_estimators=100, max_depth=10)
+        'Random Forest': RandomForestClassifier(random_state=42, n_estimators=100, max_depth=10, n_jobs=-1)
     }
 
-    # Train each model and store results
-    trained_models = {}
-    predictions = {}
+    # Train the models at the same time (one process per model, see model_runner.py)
+    # Logistic Regression needs scaled data, others work with original data
+    tasks = {}
 
     for name, model in models.items():
-        print(f"\nTraining {name}...")
-
-        # Logistic Regression needs scaled data, others work with original data
         if name == 'Logistic Regression':
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled)
+            tasks[name] = (model, X_train_scaled, y_train, X_test_scaled)
         else:
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            y_pred_proba = model.predict_proba(X_test)
+            tasks[name] = (model, X_train, y_train, X_test)
 
-        # Store results
-        trained_models[name] = model
-        predictions[name] = {
-            'y_pred': y_pred,
-            'y_pred_proba': y_pred_proba
-        }
+    with ModelRunner() as runner:
+        results_by_model = runner.run(tasks)
 
-        print(f"{name} training completed!")
+    # Store results
+    trained_models = {name: result['model'] for name, result in results_by_model.items()}
+    predictions = {name: {'y_pred': result['y_pred'], 'y_pred_proba': result['y_pred_proba']}
+                   for name, result in results_by_model.items()}
 
 
     # ================================================================
@@ -190,6 +174,7 @@ def main():
 
     # Create a results dataframe to store all metrics
     results = []
+    roc_curves = {}
 
     for name in models.keys():
         y_pred = predictions[name]['y_pred']
@@ -204,25 +189,9 @@ def main():
 
         # For multi-class ROC-AUC, we'll calculate macro average
         # (Note: ROC-AUC for multi-class is more complex, we'll use macro averaging)
-        try:
-            # Binarize the output for multi-class ROC-AUC calculation
-            y_test_binarized = label_binarize(y_test, classes=[0, 1, 2])
-            n_classes = y_test_binarized.shape[1]
-
-            print('================ Y-TEST-BINARIZED ================')
-            print(y_test_binarized)
-            print(n_classes)
-
-            # Calculate ROC-AUC for each class and take macro average
-            roc_auc_scores = []
-            for i in range(n_classes):
-                if len(np.unique(y_test_binarized[:, i])) > 1:  # Check if class exists in test set
-                    fpr, tpr, _ = roc_curve(y_test_binarized[:, i], y_pred_proba[:, i])
-                    roc_auc_scores.append(auc(fpr, tpr))
-
-            roc_auc = np.mean(roc_auc_scores) if roc_auc_scores else 0.0
-        except:
-            roc_auc = 0.0  # If ROC-AUC calculation fails
+        # The per-class curves are computed once and kept for the ROC plot (see roc_evaluation.py)
+        roc_curves[name] = RocCurves(y_test, y_pred_proba)
+        roc_auc = roc_curves[name].mean_auc()
 
         results.append({
             'Model': name,
@@ -297,38 +266,12 @@ def main():
     # For multi-class ROC curves, we plot the macro-average
     colors = cycle(['aqua', 'darkorange', 'cornflowerblue'])
     for name, color in zip(models.keys(), colors):
-        y_pred_proba = predictions[name]['y_pred_proba']
-
-        # Compute ROC curve and ROC area for each class
-        fpr = dict()
-        tpr = dict()
-        roc_auc = dict()
-
-        # Binarize the output
-        y_test_binarized = label_binarize(y_test, classes=[0, 1, 2])
-        n_classes = y_test_binarized.shape[1]
-
-        for i in range(n_classes):
-            if len(np.unique(y_test_binarized[:, i])) > 1:
-                fpr[i], tpr[i], _ = roc_curve(y_test_binarized[:, i], y_pred_proba[:, i])
-                roc_auc[i] = auc(fpr[i], tpr[i])
+        # Macro-average ROC curve and ROC area, from the curves of the evaluation step
+        roc = roc_curves[name]
 
-        # Compute macro-average ROC curve and ROC area
-        if len(roc_auc) > 0:
-            # First aggregate all false positive rates
-            all_fpr = np.unique(np.concatenate([fpr[i] for i in roc_auc.keys()]))
-
-            # Then interpolate all ROC curves at this points
-            mean_tpr = np.zeros_like(all_fpr)
-            for i in roc_auc.keys():
-                mean_tpr += np.interp(all_fpr, fpr[i], tpr[i])
-
-            # Finally average it and compute AUC
-            mean_tpr /= len(roc_auc)
-
-            macro_auc = auc(all_fpr, mean_tpr)
-            plt.plot(all_fpr, mean_tpr, color=color,
-                     label=f'{name} (Macro AUC = {macro_auc:.3f})', linewidth=2)
+        if 'macro' in roc.auc:
+            plt.plot(roc.fpr['macro'], roc.tpr['macro'], color=color,
+                     label=f'{name} (Macro AUC = {roc.auc["macro"]:.3f})', linewidth=2)
 
     plt.plot([0, 1], [0, 1], 'k--', alpha=0.5, label='Random Classifier')
     plt.xlabel('False Positive Rate')
@@ -471,6 +414,12 @@ def main():
     results_df.to_csv('model_comparison_results.csv', index=False)
     print("Results saved to 'model_comparison_results.csv'")
 
+    # Save the recommended model, to score new applications with scoring_service.py
+    # (Logistic Regression was trained on the scaled features)
+    save_model(MODEL_PATH, best_overall['Model'], trained_models[best_overall['Model']],
+               scaled=best_overall['Model'] == 'Logistic Regression')
+    print(f"{best_overall['Model']} saved to '{MODEL_PATH}'")
+
     # ================================================================
     # BONUS: DETAILED CLASSIFICATION REPORTS
     # ================================================================
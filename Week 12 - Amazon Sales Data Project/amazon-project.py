@@ -2,26 +2,70 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+from sales_aggregates import SalesAggregates, aggregate_csv, aggregate_partitions, date_partitions
+from sales_cache import file_sha256, load_cached_frame, write_cached_frame
+from sales_query import SalesIndex
+from sales_charts import draw_dashboard, draw_status_distribution, render_charts
+from sales_report import save_report
+
 desired_width=580
 
 pd.set_option('display.width', desired_width)
 np.set_printoptions(linewidth=desired_width)
 pd.set_option('display.max_columns', 14)
 
-def str_to_float(value):
-    """Converts the provided value to a float"""
-    return float(str(value))
+# Types of the raw CSV columns, so the text columns with few distinct values are parsed straight into categories
+CSV_DTYPES = {
+    'Category': 'category',
+    'Customer Location': 'category',
+    'Payment Method': 'category',
+    'Status': 'category',
+}
+
+CATEGORICAL_COLUMNS = ['category', 'location', 'payment_method', 'status']
 
 
 class AmazonSalesAnalyzer:
     """Analyze Amazon sales data and provide actionable business insights"""
 
     df = None
+    verbose = True
+    _aggregates = None
+    _index = None
+
+    def __init__(self, path, chunksize=None, use_cache=True, max_workers=None, verbose=True):
+        """
+        Initialize with CSV data.
+
+        When `chunksize` is provided, the file is streamed in chunks of `chunksize` rows and only the
+        aggregates needed by the analysis are kept in memory (`self.df` stays empty). The chunks are
+        aggregated in `max_workers` worker processes when it is provided.
+
+        Otherwise the renamed and pre-processed data is cached in an Arrow file next to the CSV file
+        (when `use_cache` is set and pyarrow is installed), and later runs load it from the cache
+        until the CSV file changes.
+
+        With `verbose` off, the analyses only return their results instead of also printing them.
+        """
+        self.verbose = verbose
+
+        if chunksize:
+            try:
+                self._aggregates = aggregate_csv(path, self._prepare_chunk, chunksize, dtype=CSV_DTYPES,
+                                                 max_workers=max_workers)
+            except FileNotFoundError:
+                print(f'File not found at: `{path}`')
+
+            return
+
+        if use_cache:
+            self.df = load_cached_frame(path)
+
+            if self.df is not None:
+                return
 
-    def __init__(self, path):
-        """Initialize with CSV data"""
         try:
-            self.df = pd.read_csv(path)
+            self.df = pd.read_csv(path, dtype=CSV_DTYPES)
         except FileNotFoundError:
             print(f'File not found at: `{path}`')
 
@@ -31,10 +75,101 @@ class AmazonSalesAnalyzer:
         # Data preprocessing
         self.pre_process_data()
 
-    def rename_columns(self):
+        if use_cache:
+            write_cached_frame(path, self.df)
+
+    @classmethod
+    def from_state(cls, state_path, verbose=True):
+        """Initialize from aggregates saved with `save_state`, without reading the order history"""
+        analyzer = cls.__new__(cls)
+        analyzer.verbose = verbose
+        analyzer._aggregates = SalesAggregates.load(state_path)
+
+        return analyzer
+
+    def save_state(self, state_path):
+        """Save the aggregates, so new batches of orders can be folded into them later (see `update`)"""
+        self.aggregates.save(state_path)
+
+    def update(self, batch_path, state_path=None, chunksize=100_000):
+        """
+        Fold a new batch of orders (a CSV file with the same columns) into the analysis.
+
+        Only the batch is read, so the cost of an update depends on the size of the batch and not on
+        the size of the order history. A batch that was already folded in is skipped. When
+        `state_path` is provided, the updated aggregates are saved to it.
+        """
+        batch_id = file_sha256(batch_path)
+
+        if batch_id in self.aggregates.batches:
+            print(f'Batch `{batch_path}` has already been added to the analysis')
+        elif self.df is not None:
+            batch = self.pre_process_data(self.rename_columns(pd.read_csv(batch_path, dtype=CSV_DTYPES)))
+            batch_aggregates = SalesAggregates.from_frame(batch, offset=self.aggregates.rows)
+            batch_aggregates.batches.add(batch_id)
+
+            self.aggregates.merge(batch_aggregates)
+            self.df = pd.concat([self.df, batch], ignore_index=True)
+            self._index = None
+            self.df[CATEGORICAL_COLUMNS] = self.df[CATEGORICAL_COLUMNS].astype('category')
+        else:
+            batch_aggregates = aggregate_csv(batch_path, self._prepare_chunk, chunksize, dtype=CSV_DTYPES,
+                                             offset=self.aggregates.rows)
+            batch_aggregates.batches.add(batch_id)
+
+            self.aggregates.merge(batch_aggregates)
+
+        if state_path:
+            self.save_state(state_path)
+
+    def aggregate_by_date(self, freq='M', date_ranges=None, max_workers=None):
+        """
+        Compute the aggregates of the analysis in parallel, one date partition per worker process.
+
+        The data is partitioned by period of `freq` ('M' for months by default), or into the
+        `(start, end)` pairs of `date_ranges`, in which case the analysis only covers those ranges.
+        """
+        self._aggregates = aggregate_partitions(date_partitions(self.df, freq, date_ranges), max_workers)
+
+        return self._aggregates
+
+    def _prepare_chunk(self, chunk):
+        """Rename and pre-process a chunk of the data read in streaming mode"""
+        return self.pre_process_data(self.rename_columns(chunk))
+
+    @property
+    def aggregates(self):
+        """Sums and counts of the sales data that the analyses are computed from"""
+        if self._aggregates is None:
+            self._aggregates = SalesAggregates.from_frame(self.df)
+
+        return self._aggregates
+
+    @property
+    def index(self):
+        """Indexes over the sales data for ad-hoc queries, built on first use"""
+        if self._index is None:
+            if self.df is None:
+                raise ValueError('Queries need the sales data in memory, which is not kept in streaming mode')
+
+            self._index = SalesIndex(self.df)
+
+        return self._index
+
+    def query(self, start=None, end=None, **filters):
+        """
+        Revenue, units sold and order count of the orders matching the filters, between two dates.
+
+        Example: `analyzer.query('2025-03-10', '2025-03-16', product='Laptop', location='Miami')`.
+        The filters can be any of product, location, payment_method and status.
+        """
+        return self.index.query(start, end, **filters)
+
+    def rename_columns(self, df=None):
         """Normalize column names by removing white space and enforcing lowercase"""
+        df = self.df if df is None else df
 
-        self.df.rename(columns={
+        df.rename(columns={
             'Order ID': 'order_id',
             'Date': 'date',
             'Product': 'product',
@@ -48,13 +183,21 @@ class AmazonSalesAnalyzer:
             'Status': 'status',
         }, inplace=True)
 
-    def pre_process_data(self):
+        return df
+
+    def pre_process_data(self, df=None):
         """Clean and process the data for analysis"""
-        self.df['date'] = pd.to_datetime(self.df['date'], format='%d-%m-%y')
+        df = self.df if df is None else df
+
+        df['date'] = pd.to_datetime(df['date'], format='%d-%m-%y')
+
+        # Format "Price", "Quantity" and "Total Sales" values. The conversions run on whole columns at once
+        df['price'] = pd.to_numeric(df['price']).astype('float64')
+        df['qty'] = pd.to_numeric(df['qty'], downcast='integer')
+        df['total_sales'] = df['price'] * df['qty']
 
-        # Format "Price" and "Total Sales" values
-        self.df['price'] = self.df['price'].apply(lambda x: float(str(x)))
-        self.df['total_sales'] = self.df['price'].apply(str_to_float)
+        # Columns with few distinct values take much less memory as categories than as strings
+        df[CATEGORICAL_COLUMNS] = df[CATEGORICAL_COLUMNS].astype('category')
 
         # HINT: You can use the code below to strip whitespace from around texts in the text-based columns.
         # columns= ['Product', 'Category']
@@ -62,66 +205,71 @@ class AmazonSalesAnalyzer:
         #     # self.df[column] = self.df[column].str.strip()
         #     self.df[column] = self.df[column].apply(lambda x: str(x).strip())
 
+        return df
+
     def data_overview(self):
         """Comprehensive data exploration and overview"""
 
-        (rows, columns) = self.df.shape
+        aggregates = self.aggregates
+
+        rows = aggregates.rows
+        columns = len(aggregates.null_counts)
+
+        minDate = aggregates.min_date
+        maxDate = aggregates.max_date
 
-        minDate = self.df['date'].min()
-        maxDate = self.df['date'].max()
+        unique_products = len(aggregates.dimensions['product'])
+        unique_categories = len(aggregates.dimensions['category'])
+        unique_locations = len(aggregates.dimensions['location'])
 
-        print(f'Total Records: {rows}')
-        print(f'Date Range: {minDate.strftime('%Y-%m-%d')} to {maxDate.strftime('%Y-%m-%d')}')
-        print(f'Unique Products: {self.df['product'].nunique()}')
-        print(f'Unique Categories: {self.df['category'].nunique()}')
-        print(f'Unique Locations: {self.df['location'].nunique()}')
+        if self.verbose:
+            print(f'Total Records: {rows}')
+            print(f'Date Range: {minDate.strftime('%Y-%m-%d')} to {maxDate.strftime('%Y-%m-%d')}')
+            print(f'Unique Products: {unique_products}')
+            print(f'Unique Categories: {unique_categories}')
+            print(f'Unique Locations: {unique_locations}')
 
         # Revenue Summary
-        total_revenue = self.df['total_sales'].sum()
-        avg_order_value = self.df['total_sales'].mean()
+        total_revenue = aggregates.revenue_sum
+        avg_order_value = aggregates.avg_order_value
 
-        print('\n💰 FINANCIAL SUMMARY')
-        print(f'Total Revenue: ${total_revenue:,.1f}')
-        print(f'Average Order Value: ${avg_order_value}')
+        if self.verbose:
+            print('\n💰 FINANCIAL SUMMARY')
+            print(f'Total Revenue: ${total_revenue:,.1f}')
+            print(f'Average Order Value: ${avg_order_value}')
 
         # Data Quality Score
-        missing_data = self.df.isnull().sum()
-        data_q_score = ((len(self.df) * len(self.df.columns) - missing_data.sum()) / (len(self.df) * len(self.df.columns))) * 100
-
-        print(f'\n🏥 DATA HEALTH SCORE: {data_q_score:.1f}%')
+        missing_data = aggregates.null_counts
+        data_q_score = ((rows * columns - missing_data.sum()) / (rows * columns)) * 100
 
         # Status distribution
-        status_distribution = self.df['status'].value_counts()
+        status_distribution = aggregates.status_distribution()
+
+        if self.verbose:
+            print(f'\n🏥 DATA HEALTH SCORE: {data_q_score:.1f}%')
 
-        print('\nORDER STATUS DISTRIBUTION')
-        for status, count in status_distribution.items():
-            percentage = (count / len(self.df)) * 100
-            print(f'   {status}: {count} ({percentage:.1f}%)')
+            print('\nORDER STATUS DISTRIBUTION')
+            for status, count in status_distribution.items():
+                percentage = (count / rows) * 100
+                print(f'   {status}: {count} ({percentage:.1f}%)')
 
         return {
             'total_records': rows,
+            'start_date': minDate,
+            'end_date': maxDate,
+            'unique_products': unique_products,
+            'unique_categories': unique_categories,
+            'unique_locations': unique_locations,
             'total_revenue': total_revenue,
             'avg_order_value': avg_order_value,
             'health_score': data_q_score,
+            'missing_values': missing_data.to_dict(),
             'status_distribution': status_distribution.to_dict()
         }
 
     def plot_status_distribution(self, status_distribution, save_path):
         """Create a pie chart for order status distribution"""
-        fig, ax = plt.subplots(figsize=(10, 8))
-
-        # Create pie chart
-        wedges, texts, autotexts = ax.pie(
-            list(status_distribution.values()),
-            labels=list(status_distribution.keys()),
-            autopct='%1.1f%%',
-            startangle=90,
-            explode=[0.05 if status == 'Cancelled' else 0 for status in status_distribution.keys()],
-        )
-
-        ax.set_title('Order Status Distribution', fontsize=16, fontweight='bold', pad=20)
-
-        plt.tight_layout()
+        draw_status_distribution(status_distribution)
 
         # Save plot image
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
@@ -131,35 +279,31 @@ class AmazonSalesAnalyzer:
 
     def product_performance_analysis(self):
         """" """
-        product_performance = self.df.groupby('product').agg({
-            'total_sales': ['sum', 'count'],
-            'qty': 'sum',
-        })
-
-        product_performance.columns = ['total_revenue', 'order_count', 'units_sold']
+        product_performance = self.aggregates.dimension('product')
         product_performance = product_performance.sort_values('total_revenue', ascending=False)
 
         # Calculate revenue percentage
-        total_revenue = self.df['total_sales'].sum()
+        total_revenue = self.aggregates.revenue_sum
         product_performance['revenue_percentage'] = ((product_performance['total_revenue'] / total_revenue) * 100).round(2)
 
         # Top and bottom performers
         top_3_products = product_performance.head(3)
         bottom_3_products = product_performance.tail(3)
 
-        print('\nHALL OF FAME - TOP 3 PRODUCTS:')
-        for i, (product, data) in enumerate(top_3_products.iterrows(), 1):
-            print(f'{product}')
-            print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
-            print(f'Units Sold: {data['units_sold']:.0f} | Orders: {data['order_count']:.0f}')
-            print('')
+        if self.verbose:
+            print('\nHALL OF FAME - TOP 3 PRODUCTS:')
+            for i, (product, data) in enumerate(top_3_products.iterrows(), 1):
+                print(f'{product}')
+                print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
+                print(f'Units Sold: {data['units_sold']:.0f} | Orders: {data['order_count']:.0f}')
+                print('')
 
-        print('\nHALL OF SHAME - BOTTOM 3 PRODUCTS:')
-        for i, (product, data) in enumerate(bottom_3_products.iterrows(), 1):
-            print(f'{product}')
-            print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
-            print(f'Units Sold: {data['units_sold']:.0f} | Orders: {data['order_count']:.0f}')
-            print('')
+            print('\nHALL OF SHAME - BOTTOM 3 PRODUCTS:')
+            for i, (product, data) in enumerate(bottom_3_products.iterrows(), 1):
+                print(f'{product}')
+                print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
+                print(f'Units Sold: {data['units_sold']:.0f} | Orders: {data['order_count']:.0f}')
+                print('')
 
 
         # Performance gap analysis
@@ -167,13 +311,19 @@ class AmazonSalesAnalyzer:
         bottom_revenue = bottom_3_products['total_revenue'].sum()
         performance_gap = top_revenue / bottom_revenue if bottom_revenue > 0 else float('inf')
 
-        print('\nPERFORMANCE GAP ANALYSIS:')
-        print(f'Top 3 Revenue: ${top_revenue:,} ({((top_revenue / total_revenue) * 100):.1f}% of total)')
-        print(f'Bottom 3 Revenue: ${bottom_revenue:,} ({((bottom_revenue / total_revenue) * 100):.1f}% of total)')
-        print(f'Performance Multiplier: {performance_gap:.2f}x')
+        if self.verbose:
+            print('\nPERFORMANCE GAP ANALYSIS:')
+            print(f'Top 3 Revenue: ${top_revenue:,} ({((top_revenue / total_revenue) * 100):.1f}% of total)')
+            print(f'Bottom 3 Revenue: ${bottom_revenue:,} ({((bottom_revenue / total_revenue) * 100):.1f}% of total)')
+            print(f'Performance Multiplier: {performance_gap:.2f}x')
 
         return {
-            'product_performance': product_performance
+            'product_performance': product_performance,
+            'top_products': top_3_products.to_dict('index'),
+            'bottom_products': bottom_3_products.to_dict('index'),
+            'top_revenue': top_revenue,
+            'bottom_revenue': bottom_revenue,
+            'performance_gap': performance_gap,
         }
 
     def payment_method_analysis(self):
@@ -182,41 +332,45 @@ class AmazonSalesAnalyzer:
         """
         
         # Payment method analysis
-        payment_analysis = self.df.groupby('payment_method').agg({
-            'total_sales': ['sum', 'count', 'mean'],
-            'qty': ['sum'],
-        }).round(2)
-
-        payment_analysis.columns = ['total_revenue', 'order_count', 'avg_order_value', 'units_sold']
+        payment_analysis = self.aggregates.dimension('payment_method')
+        payment_analysis.insert(2, 'avg_order_value', payment_analysis['total_revenue'] / payment_analysis['order_count'])
+        payment_analysis = payment_analysis.round(2)
         payment_analysis = payment_analysis.sort_values('total_revenue', ascending=False)
 
-        total_revenue = self.df['total_sales'].sum()
+        total_revenue = self.aggregates.revenue_sum
         payment_analysis['revenue_percentage'] = ((payment_analysis['total_revenue'] / total_revenue) * 100).round(2)
 
-        print('\nPAYMENT METHOD PERFORMANCE:')
-        for method, data in payment_analysis.iterrows():
-            print(f'{method}')
-            print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
-            print(f'Orders: {data['order_count']:.0f}')
-            print(f'Average Order Value: ${data['avg_order_value']:.2f}')
-            print(f'Units Sold: {data['units_sold']:.0f}')
-            print('')
+        if self.verbose:
+            print('\nPAYMENT METHOD PERFORMANCE:')
+            for method, data in payment_analysis.iterrows():
+                print(f'{method}')
+                print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
+                print(f'Orders: {data['order_count']:.0f}')
+                print(f'Average Order Value: ${data['avg_order_value']:.2f}')
+                print(f'Units Sold: {data['units_sold']:.0f}')
+                print('')
 
         # Geographic payment preference
-        location_payment = pd.crosstab(self.df['location'], self.df['payment_method'], normalize='index') * 100
+        location_payment = self.aggregates.location_payment_share()
 
-        print(f'\nGEOGRAPHIC PAYMENT PREFERENCE')
-        top_locations = self.df['location'].value_counts().head().index
+        preferred_payment_methods = {}
+        top_locations = self.aggregates.top_locations()
         for location in top_locations:
             if location in location_payment.index:
-                top_payment_method = location_payment.loc[location].idxmax()
-                top_pct = location_payment.loc[location].max()
-
-                print(f'    {location} prefers {top_payment_method} ({top_pct:.1f}%)')
+                preferred_payment_methods[location] = {
+                    'payment_method': location_payment.loc[location].idxmax(),
+                    'percentage': location_payment.loc[location].max(),
+                }
+
+        if self.verbose:
+            print(f'\nGEOGRAPHIC PAYMENT PREFERENCE')
+            for location, preference in preferred_payment_methods.items():
+                print(f'    {location} prefers {preference['payment_method']} ({preference['percentage']:.1f}%)')
         
         return {
             'payment_performance': payment_analysis.to_dict('index'),
             'geographic_preferences': location_payment.to_dict('index'),
+            'top_location_preferences': preferred_payment_methods,
         }
 
     def geographical_analysis(self):
@@ -225,28 +379,25 @@ class AmazonSalesAnalyzer:
             - **Deliverable:** Market expansion strategy with priority rankings
         """
 
-        location_performance = self.df.groupby('location').agg({
-            'total_sales': ['sum', 'count', 'mean'],
-            'qty': ['sum'],
-        })
-
-        location_performance.columns = ['total_revenue', 'order_count', 'avg_order_value', 'units_sold']
+        location_performance = self.aggregates.dimension('location')
+        location_performance.insert(2, 'avg_order_value', location_performance['total_revenue'] / location_performance['order_count'])
         location_performance = location_performance.sort_values('total_revenue', ascending=False)
 
-        total_revenue = self.df['total_sales'].sum()
+        total_revenue = self.aggregates.revenue_sum
         location_performance['revenue_percentage'] = ((location_performance['total_revenue'] / total_revenue) * 100).round(2)
 
         # Top 5 locations
         top_5_markets = location_performance.head()
 
-        print('\nTOP 5 REVENUE GENERATING MARKETS:')
-        for location, data in top_5_markets.iterrows():
-            print(f'{location}')
-            print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
-            print(f'Orders: {data['order_count']:.0f}')
-            print(f'Average Order Value: ${data['avg_order_value']:.2f}')
-            print(f'Units Sold: {data['units_sold']:.0f}')
-            print('')
+        if self.verbose:
+            print('\nTOP 5 REVENUE GENERATING MARKETS:')
+            for location, data in top_5_markets.iterrows():
+                print(f'{location}')
+                print(f'Revenue: ${data['total_revenue']:,} ({data['revenue_percentage']:.1f}% of total)')
+                print(f'Orders: {data['order_count']:.0f}')
+                print(f'Average Order Value: ${data['avg_order_value']:.2f}')
+                print(f'Units Sold: {data['units_sold']:.0f}')
+                print('')
         
         # Untapped market = [low revenue, high AOV (average order value)]
         # Low revenue = location total revenue less than the total revenue median
@@ -256,11 +407,13 @@ class AmazonSalesAnalyzer:
             (location_performance['avg_order_value'] > location_performance['avg_order_value'].median()) 
         ]
 
-        print('\nUNTAPPED MARKETS:')
-        for location, data in untapped_market.iterrows():
-            print(f'{location}: AOV ${data['avg_order_value']:.2f}, Revenue: ${data["total_revenue"]:,.2f}')
+        if self.verbose:
+            print('\nUNTAPPED MARKETS:')
+            for location, data in untapped_market.iterrows():
+                print(f'{location}: AOV ${data['avg_order_value']:.2f}, Revenue: ${data["total_revenue"]:,.2f}')
 
         return {
+            'location_performance': location_performance.to_dict('index'),
             'top_markets': top_5_markets.to_dict('index'),
             'market_concentration': location_performance.head(1)['revenue_percentage'].iloc[0],
             'untapped_markets': untapped_market.to_dict('index')
@@ -269,42 +422,38 @@ class AmazonSalesAnalyzer:
     def temporal_analysis(self):
         """"""
 
-        # Extract temporal features
-        self.df['year'] = self.df['date'].dt.year
-        self.df['month'] = self.df['date'].dt.month
-        self.df['week_day'] = self.df['date'].dt.day_name()
-        self.df['week_number'] = self.df['date'].dt.isocalendar().week
+        aggregates = self.aggregates
 
-        weekly_sales = self.df.groupby('week_number')['total_sales'].sum().sort_values(ascending=False)
+        weekly_sales = aggregates.weekly_revenue.sort_values(ascending=False)
         golden_week = weekly_sales.index[0]
         golden_week_revenue = weekly_sales.iloc[0]
 
-        print('\nGOLDEN WEEK:')
-        print(f'Week {golden_week} is the golden week with a revenue of ${golden_week_revenue:,.2f}')
+        if self.verbose:
+            print('\nGOLDEN WEEK:')
+            print(f'Week {golden_week} is the golden week with a revenue of ${golden_week_revenue:,.2f}')
 
         # Day of week pattern
-        dow_performance = self.df.groupby('week_day').agg({
-            'total_sales': ['sum', 'count', 'mean'],
-        }).round(2)
-
-        dow_performance.columns = ['total_revenue', 'order_count', 'avg_order_value']
+        dow_performance = aggregates.week_day.copy()
+        dow_performance['avg_order_value'] = dow_performance['total_revenue'] / dow_performance['order_count']
+        dow_performance = dow_performance.round(2)
 
         days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
         dow_performance = dow_performance.reindex(days)
 
-        print('\nDAY-OF-WEEK PERFORMANCE:')
-        for day, data in dow_performance.iterrows():
-            print(f'    {day}: ${data["total_revenue"]:,.2f} in revenue | {data['order_count']:.0f} orders')
-
         best_day = dow_performance['total_revenue'].idxmax()
         worst_day = dow_performance['total_revenue'].idxmin()
 
-        print('\nBEST TIMING INSIGHT')
-        print(f'Best sales day: {best_day}')
-        print(f'Worst sales day: {worst_day} (Perfect for marketing campaigns and promotions)')
+        if self.verbose:
+            print('\nDAY-OF-WEEK PERFORMANCE:')
+            for day, data in dow_performance.iterrows():
+                print(f'    {day}: ${data["total_revenue"]:,.2f} in revenue | {data['order_count']:.0f} orders')
+
+            print('\nBEST TIMING INSIGHT')
+            print(f'Best sales day: {best_day}')
+            print(f'Worst sales day: {worst_day} (Perfect for marketing campaigns and promotions)')
 
         # Monthly trends
-        monthly_sales = self.df.groupby('month')['total_sales'].sum()
+        monthly_sales = aggregates.monthly_revenue
         peak_month = monthly_sales.idxmax()
         slow_month = monthly_sales.idxmin()
 
@@ -323,9 +472,10 @@ class AmazonSalesAnalyzer:
             12: 'December',
         }
 
-        print('\nSEASONAL PATTERN')
-        print(f'Peak Month: {month_names[peak_month]} (${monthly_sales[peak_month]:,.2f})')
-        print(f'Slow Month: {month_names[slow_month]} (${monthly_sales[slow_month]:,.2f})')
+        if self.verbose:
+            print('\nSEASONAL PATTERN')
+            print(f'Peak Month: {month_names[peak_month]} (${monthly_sales[peak_month]:,.2f})')
+            print(f'Slow Month: {month_names[slow_month]} (${monthly_sales[slow_month]:,.2f})')
 
         return {
             'golden_week': {
@@ -337,51 +487,67 @@ class AmazonSalesAnalyzer:
             'peak_month': peak_month,
             'slow_month': slow_month,
             'dow_performance': dow_performance.to_dict('index'),
+            'weekly_revenue': aggregates.weekly_revenue.to_dict(),
+            'monthly_revenue': {month_names[month]: revenue for month, revenue in monthly_sales.items()},
+        }
+
+    def dashboard_data(self):
+        """Revenue per product, payment method, location and category, plotted on the dashboard"""
+        return {
+            'products_revenue': self.aggregates.dimension('product')['total_revenue'],
+            'payment_revenue': self.aggregates.dimension('payment_method')['total_revenue'],
+            'location_revenue': self.aggregates.dimension('location')['total_revenue'],
+            'category_revenue': self.aggregates.dimension('category')['total_revenue'],
         }
 
     def create_visualizations(self, save_path):
         """Create visualizations for presentation"""
-
-        # Setup of the plot environment
-        fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(25, 20))
-        fig.suptitle('Amazon Sales Analytics', fontsize=16, fontweight='bold')
-
-        # Top products by revenue
-        products_revenue = self.df.groupby('product')['total_sales'].sum()
-        axes[0, 0].barh(range(len(products_revenue)), products_revenue.values)
-        axes[0, 0].set_yticks(range(len(products_revenue)))
-        axes[0, 0].set_yticklabels(products_revenue.index)
-        axes[0, 0].set_title('Top Products By Revenue')
-        axes[0, 0].grid()
-
-        # Payment method
-        payment_performance = self.df.groupby('payment_method')['total_sales'].sum()
-        axes[0, 1].pie(payment_performance.values, labels=payment_performance.index, autopct='%1.1f%%')
-        axes[0, 1].set_title('Revenue by Payment Method')
-
-        # Geographic Distribution
-        location_revenue = self.df.groupby('location')['total_sales'].sum().nlargest(10)
-        axes[1, 0].bar(range(len(location_revenue)), location_revenue.values)
-        axes[1, 0].set_xticks(range(len(location_revenue)))
-        axes[1, 0].set_xticklabels(location_revenue.index, rotation=45, ha='right')
-        axes[1, 0].set_title('Total 10 Markets By Revenue')
-        axes[1, 0].set_ylabel('Revenue ($)')
-
-        # Category Performance
-        category_performance = self.df.groupby('category')['total_sales'].sum()
-        axes[1, 1].bar(category_performance.index, category_performance.values)
-        axes[1, 1].set_ylabel('Revenue ($)')
-        axes[1, 1].set_title('Revenue by Category')
-        axes[1, 1].grid(axis='y', alpha=0.5, linestyle='--')
-        axes[1, 1].tick_params(axis='x', rotation=45)
+        draw_dashboard(**self.dashboard_data())
 
         plt.savefig(save_path, dpi=300, bbox_inches='tight')
 
         plt.tight_layout()
         plt.show()
 
-    def run_analysis(self):
-        """Run all analysis"""
+    def render_charts(self, status_path, dashboard_path, dpi=300, fmt=None, max_workers=None, skip_unchanged=True):
+        """
+        Render the status pie chart and the dashboard off-screen, in parallel worker processes.
+
+        Nothing is shown, so this works in headless batch runs. `fmt` sets the image format (the
+        extension of the paths is replaced), and charts whose aggregates have not changed since
+        they were last rendered are skipped unless `skip_unchanged` is False.
+        """
+        return render_charts({
+            status_path: ('status_distribution', {'status_distribution': self.aggregates.status_distribution().to_dict()}),
+            dashboard_path: ('dashboard', self.dashboard_data()),
+        }, dpi=dpi, fmt=fmt, max_workers=max_workers, skip_unchanged=skip_unchanged)
+
+    def build_report(self):
+        """Run all analysis and return their results, keyed by analysis"""
+        return {
+            'data_overview': self.data_overview(),
+            'product_performance': self.product_performance_analysis(),
+            'payment_methods': self.payment_method_analysis(),
+            'geography': self.geographical_analysis(),
+            'temporal': self.temporal_analysis(),
+        }
+
+    def save_report(self, path):
+        """
+        Run all analysis and save the results to `path`, as JSON or as a Parquet table of KPIs when
+        the path ends with `.parquet`. Use `verbose=False` to skip printing the analyses.
+        """
+        return save_report(self.build_report(), path)
+
+    def run_analysis(self, headless=False, dpi=300, fmt=None):
+        """
+        Run all analysis.
+
+        In `headless` mode the charts are not shown but rendered off-screen in parallel, once the
+        analysis is done, with the given `dpi` and image format `fmt` (see `render_charts`).
+        """
+        status_path = '../data/amazon_order_status_distribution.png'
+        dashboard_path = '../data/amazon_sales_analysis_dashboard.png'
 
         print('\n')
         print('='*80)
@@ -389,14 +555,21 @@ class AmazonSalesAnalyzer:
         print('='*80)
         print('\n')
 
-        # Execute all analysis
+        # Execute all analysis. The aggregates they share are computed once, in a single pass over the data
         result = self.data_overview()
-        self.plot_status_distribution(result['status_distribution'], '../data/amazon_order_status_distribution.png')
+
+        if not headless:
+            self.plot_status_distribution(result['status_distribution'], status_path)
+
         self.product_performance_analysis()
         self.payment_method_analysis()
         self.geographical_analysis()
         self.temporal_analysis()
-        self.create_visualizations('../data/amazon_sales_analysis_dashboard.png')
+
+        if headless:
+            self.render_charts(status_path, dashboard_path, dpi=dpi, fmt=fmt)
+        else:
+            self.create_visualizations(dashboard_path)
 
 if __name__ == '__main__':
     analyzer = AmazonSalesAnalyzer('../data/amazon_sales_data_2025.csv')
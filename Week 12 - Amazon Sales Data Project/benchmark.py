@@ -0,0 +1,122 @@
+import importlib.util
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+sys.path.append(DATA_DIRECTORY)
+
+from generate_amazon_sales_data import write_amazon_sales_data
+
+# The results of every run are appended here, next to the data files (and ignored by git)
+RESULTS_PATH = os.path.join(DATA_DIRECTORY, 'benchmark_results.csv')
+
+
+def load_analyzer_module():
+    """Import `amazon-project.py`, whose name is not a valid module name"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'amazon-project.py')
+    spec = importlib.util.spec_from_file_location('amazon_project', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['amazon_project'] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+def measure(stage, size, results, function, *args, **kwargs):
+    """Run one stage, recording its wall time and the peak memory it allocated"""
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    value = function(*args, **kwargs)
+
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results.append({
+        'rows': size,
+        'stage': stage,
+        'seconds': round(seconds, 4),
+        'peak_memory_mb': round(peak / 1024 ** 2, 2),
+    })
+    print(f'{size:>12,} rows | {stage:<30} {seconds:>9.3f}s {peak / 1024 ** 2:>10.1f} MB')
+
+    return value
+
+
+def benchmark(sizes, directory, n_products=50, n_locations=25, skew=1.0, chunksize=1_000_000):
+    """
+    Time and memory-profile every stage of `AmazonSalesAnalyzer` on synthetic files of each size.
+
+    Peak memory is measured with `tracemalloc` (the allocations of Python, numpy and pandas) and is
+    the peak during the stage, on top of what earlier stages still hold.
+    """
+    project = load_analyzer_module()
+    results = []
+
+    for size in sizes:
+        path = os.path.join(directory, f'amazon_sales_{size}.csv')
+
+        if not os.path.exists(path):
+            write_amazon_sales_data(path, size, n_products=n_products, n_locations=n_locations, skew=skew)
+
+        # The stages of `AmazonSalesAnalyzer.__init__`, measured one by one
+        analyzer = project.AmazonSalesAnalyzer.__new__(project.AmazonSalesAnalyzer)
+        analyzer.verbose = False
+
+        analyzer.df = measure('load', size, results, pd.read_csv, path, dtype=project.CSV_DTYPES)
+        measure('rename_columns', size, results, analyzer.rename_columns)
+        measure('pre_process_data', size, results, analyzer.pre_process_data)
+
+        measure('aggregates', size, results, lambda: analyzer.aggregates)
+        measure('data_overview', size, results, analyzer.data_overview)
+        measure('product_performance_analysis', size, results, analyzer.product_performance_analysis)
+        measure('payment_method_analysis', size, results, analyzer.payment_method_analysis)
+        measure('geographical_analysis', size, results, analyzer.geographical_analysis)
+        measure('temporal_analysis', size, results, analyzer.temporal_analysis)
+
+        measure('visualization', size, results, analyzer.render_charts,
+                os.path.join(directory, 'status.png'), os.path.join(directory, 'dashboard.png'),
+                dpi=100, skip_unchanged=False)
+
+        measure('query_index', size, results, lambda: analyzer.index)
+        measure('query', size, results, analyzer.query, '2025-03-01', '2025-03-31', product='Laptop')
+
+        measure('streaming_analysis', size, results, project.AmazonSalesAnalyzer,
+                path, chunksize=chunksize, verbose=False)
+
+    return pd.DataFrame(results)
+
+
+def save_results(results, path=RESULTS_PATH):
+    """Append the results to a CSV file, with the date and machine, to compare runs over time"""
+    results = results.assign(
+        run_at=datetime.now().isoformat(timespec='seconds'),
+        machine=platform.node(),
+        python=platform.python_version(),
+        pandas=pd.__version__,
+    )
+    results.to_csv(path, mode='a', index=False, header=not os.path.exists(path))
+
+    return path
+
+
+def main(results_path=RESULTS_PATH):
+    # Sizes in number of rows. Add 10_000_000 or 100_000_000 for the large runs (it takes a while)
+    sizes = [10_000, 100_000, 1_000_000]
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = benchmark(sizes, directory)
+
+    print(f'Results appended to {save_results(results, results_path)}')
+    print(results.pivot(index='stage', columns='rows', values='seconds').round(3))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Columns the sales data is grouped by for the product, payment and geographic analyses
+DIMENSIONS = ['product', 'category', 'payment_method', 'location']
+
+WEEK_DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _group_sum(codes, size, values=None):
+    """
+    Sum `values` (or count rows when no values are given) for every group code in a single pass.
+
+    Rows with a missing group (code -1) or a missing value are skipped, like in a pandas groupby.
+    """
+    valid = codes >= 0
+
+    if values is None:
+        return np.bincount(codes[valid], minlength=size)
+
+    valid &= ~np.isnan(values)
+
+    return np.bincount(codes[valid], weights=values[valid], minlength=size)
+
+
+def _factorize(column):
+    """Integer codes and unique values of a column (plain values, even for categorical columns)"""
+    codes, uniques = pd.factorize(column)
+
+    return codes, np.asarray(uniques)
+
+
+def _row_positions(df, offset):
+    """Position of every row in the whole dataset: its index label (for chunks and partitions) plus `offset`"""
+    if pd.api.types.is_integer_dtype(df.index):
+        return df.index.to_numpy() + offset
+
+    return np.arange(len(df)) + offset
+
+
+def _counts(codes, uniques, name, positions):
+    """
+    Value counts of factorized codes, with the position of the row each value first appears in.
+
+    The first positions let merged counts be ordered like `value_counts` on the whole dataset,
+    whichever order the chunks or partitions are merged in.
+    """
+    present, first_index = np.unique(codes, return_index=True)
+    first_seen = positions[first_index[present >= 0]]
+
+    return pd.DataFrame({
+        'count': _group_sum(codes, len(uniques)),
+        'first_seen': first_seen,
+    }, index=pd.Index(uniques, name=name))
+
+
+def _value_counts(counts):
+    """Counts sorted like `value_counts`: by count, ties in order of first appearance"""
+    counts = counts.sort_values('first_seen', kind='stable')['count'].rename('count')
+
+    return counts.sort_values(ascending=False)
+
+
+def _combine(left, right):
+    """Add two partial aggregates together, treating missing groups as zero"""
+    if left is None:
+        return right
+
+    if right is None:
+        return left
+
+    return left.add(right, fill_value=0).fillna(0).sort_index()
+
+
+def _combine_counts(left, right):
+    """Add two value counts together, keeping the earliest first appearance of every value"""
+    if left is None:
+        return right
+
+    if right is None:
+        return left
+
+    return pd.concat([left, right]).groupby(level=0).agg({'count': 'sum', 'first_seen': 'min'})
+
+
+def _earliest(left, right):
+    dates = [date for date in (left, right) if date is not None and pd.notna(date)]
+    return min(dates) if dates else None
+
+
+def _latest(left, right):
+    dates = [date for date in (left, right) if date is not None and pd.notna(date)]
+    return max(dates) if dates else None
+
+
+class SalesAggregates:
+    """
+    Partial aggregates (sums and counts) of the sales data.
+
+    Aggregates computed from separate chunks of the data can be merged together, so the
+    analysis of a file only needs to keep one chunk of rows in memory at a time. They can also
+    be saved, and new batches of orders folded into the saved state later on.
+    """
+
+    def __init__(self):
+        # Fingerprints of the batch files folded into the aggregates
+        self.batches = set()
+
+        self.rows = 0
+        self.null_counts = None
+
+        self.min_date = None
+        self.max_date = None
+
+        self.revenue_sum = 0.0
+        self.revenue_count = 0
+
+        # Revenue, order count and units sold per product, category, payment method and location
+        self.dimensions = {dimension: None for dimension in DIMENSIONS}
+
+        self.status_counts = None
+        self.location_counts = None
+        self.location_payment = None
+
+        self.weekly_revenue = None
+        self.week_day = None
+        self.monthly_revenue = None
+
+    @classmethod
+    def from_frame(cls, df, offset=0):
+        """
+        Compute the partial aggregates of a (chunk of the) sales dataframe.
+
+        Every grouping column is factorized once and all the group sums and counts are computed
+        from the integer codes with `np.bincount`, instead of running one `groupby` per analysis.
+
+        `offset` is added to the index labels of the rows to get their position in the whole data,
+        for batches of orders that are numbered from zero.
+        """
+        aggregates = cls()
+        positions = _row_positions(df, offset)
+
+        aggregates.rows = len(df)
+        aggregates.null_counts = df.isnull().sum()
+
+        aggregates.min_date = df['date'].min()
+        aggregates.max_date = df['date'].max()
+
+        sales = df['total_sales'].to_numpy(dtype='float64', na_value=np.nan)
+        qty = df['qty'].to_numpy(dtype='float64', na_value=np.nan)
+        sales_count = (~np.isnan(sales)).astype('int64')
+
+        aggregates.revenue_sum = float(np.nansum(sales))
+        aggregates.revenue_count = int(sales_count.sum())
+
+        factorized = {}
+
+        for dimension in DIMENSIONS:
+            codes, uniques = _factorize(df[dimension])
+            factorized[dimension] = (codes, uniques)
+
+            performance = pd.DataFrame({
+                'total_revenue': _group_sum(codes, len(uniques), sales),
+                'order_count': _group_sum(codes, len(uniques), sales_count).astype('int64'),
+                'units_sold': _group_sum(codes, len(uniques), qty),
+            }, index=pd.Index(uniques, name=dimension))
+
+            if pd.api.types.is_integer_dtype(df['qty']):
+                performance['units_sold'] = performance['units_sold'].astype('int64')
+
+            aggregates.dimensions[dimension] = performance.sort_index()
+
+        status_codes, statuses = _factorize(df['status'])
+        aggregates.status_counts = _counts(status_codes, statuses, 'status', positions)
+
+        location_codes, locations = factorized['location']
+        aggregates.location_counts = _counts(location_codes, locations, 'location', positions)
+
+        # Location x payment method order counts, from the combined codes of both columns
+        payment_codes, payment_methods = factorized['payment_method']
+        paired = np.where((location_codes >= 0) & (payment_codes >= 0),
+                          location_codes * len(payment_methods) + payment_codes, -1)
+        location_payment = _group_sum(paired, len(locations) * len(payment_methods))
+        location_payment = pd.DataFrame(
+            location_payment.reshape(len(locations), len(payment_methods)),
+            index=pd.Index(locations, name='location'),
+            columns=pd.Index(payment_methods, name='payment_method'),
+        )
+        aggregates.location_payment = location_payment.loc[
+            location_payment.sum(axis=1) > 0, location_payment.sum(axis=0) > 0
+        ].sort_index().sort_index(axis=1)
+
+        # Temporal features
+        dates = df['date']
+        has_date = dates.notna().to_numpy()
+
+        week_codes = np.where(has_date, dates.dt.isocalendar().week.fillna(0).to_numpy(dtype='int64'), -1)
+        week_rows = _group_sum(week_codes, 54)
+        weekly_revenue = pd.Series(_group_sum(week_codes, 54, sales), index=pd.RangeIndex(54, name='week'))
+        aggregates.weekly_revenue = weekly_revenue[week_rows > 0]
+
+        day_codes = np.where(has_date, dates.dt.dayofweek.fillna(0).to_numpy(dtype='int64'), -1)
+        day_rows = _group_sum(day_codes, 7)
+        week_day = pd.DataFrame({
+            'total_revenue': _group_sum(day_codes, 7, sales),
+            'order_count': _group_sum(day_codes, 7, sales_count).astype('int64'),
+        }, index=pd.Index(WEEK_DAYS, name='date'))
+        aggregates.week_day = week_day[day_rows > 0].sort_index()
+
+        month_codes = np.where(has_date, dates.dt.month.fillna(0).to_numpy(dtype='int64'), -1)
+        month_rows = _group_sum(month_codes, 13)
+        monthly_revenue = pd.Series(_group_sum(month_codes, 13, sales), index=pd.RangeIndex(13, name='date'))
+        aggregates.monthly_revenue = monthly_revenue[month_rows > 0]
+
+        return aggregates
+
+    def merge(self, other):
+        """Fold the aggregates of another chunk into these aggregates"""
+        self.batches |= other.batches
+
+        self.rows += other.rows
+        self.null_counts = _combine(self.null_counts, other.null_counts)
+
+        self.min_date = _earliest(self.min_date, other.min_date)
+        self.max_date = _latest(self.max_date, other.max_date)
+
+        self.revenue_sum += other.revenue_sum
+        self.revenue_count += other.revenue_count
+
+        for dimension in DIMENSIONS:
+            self.dimensions[dimension] = _combine(self.dimensions[dimension], other.dimensions[dimension])
+
+        self.status_counts = _combine_counts(self.status_counts, other.status_counts)
+        self.location_counts = _combine_counts(self.location_counts, other.location_counts)
+        self.location_payment = _combine(self.location_payment, other.location_payment)
+
+        self.weekly_revenue = _combine(self.weekly_revenue, other.weekly_revenue)
+        self.week_day = _combine(self.week_day, other.week_day)
+        self.monthly_revenue = _combine(self.monthly_revenue, other.monthly_revenue)
+
+        return self
+
+    def save(self, path):
+        """Persist the aggregates, so they can be updated with new batches in a later run"""
+        pd.to_pickle(self, path)
+
+    @classmethod
+    def load(cls, path):
+        aggregates = pd.read_pickle(path)
+
+        if not isinstance(aggregates, cls):
+            raise TypeError(f'`{path}` does not contain sales aggregates')
+
+        return aggregates
+
+    @property
+    def avg_order_value(self):
+        return self.revenue_sum / self.revenue_count if self.revenue_count else float('nan')
+
+    def dimension(self, name):
+        """Revenue, order count and units sold for every value of the `name` column"""
+        performance = self.dimensions[name].copy()
+        performance['order_count'] = performance['order_count'].astype('int64')
+
+        return performance
+
+    def status_distribution(self):
+        return _value_counts(self.status_counts)
+
+    def top_locations(self, n=5):
+        """The `n` locations with the most orders"""
+        return _value_counts(self.location_counts).head(n).index
+
+    def location_payment_share(self):
+        """Percentage of each location's orders paid with each payment method"""
+        return self.location_payment.div(self.location_payment.sum(axis=1), axis=0) * 100
+
+
+def _aggregate_chunk(prepare, chunk, offset):
+    return SalesAggregates.from_frame(prepare(chunk), offset)
+
+
+def aggregate_csv(path, prepare, chunksize, dtype=None, offset=0, max_workers=None):
+    """
+    Stream a sales CSV file in chunks of `chunksize` rows and merge the aggregates of every chunk.
+
+    `prepare` is called on every raw chunk and must return the renamed and pre-processed chunk.
+    With `max_workers`, the chunks are prepared and aggregated in that many worker processes,
+    with at most two chunks per worker waiting in memory.
+    """
+    aggregates = SalesAggregates()
+    chunks = pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+
+    if not max_workers:
+        for chunk in chunks:
+            aggregates.merge(_aggregate_chunk(prepare, chunk, offset))
+
+        return aggregates
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        pending = []
+
+        for chunk in chunks:
+            pending.append(executor.submit(_aggregate_chunk, prepare, chunk, offset))
+
+            # Merge in submission order, so the result doesn't depend on which worker finishes first
+            while len(pending) >= max_workers * 2:
+                aggregates.merge(pending.pop(0).result())
+
+        for future in pending:
+            aggregates.merge(future.result())
+
+    return aggregates
+
+
+def date_partitions(df, freq='M', date_ranges=None):
+    """
+    Split the sales data into partitions by date.
+
+    By default there is one partition per period of `freq` (a pandas period alias: 'M' for months,
+    'Q' for quarters, ...), plus one for rows without a date. `date_ranges` is a list of
+    `(start, end)` pairs instead, with the end excluded; rows outside of the ranges are left out.
+    """
+    if date_ranges:
+        return [
+            df[(df['date'] >= pd.Timestamp(start)) & (df['date'] < pd.Timestamp(end))]
+            for start, end in date_ranges
+        ]
+
+    return [partition for _, partition in df.groupby(df['date'].dt.to_period(freq), dropna=False)]
+
+
+def aggregate_partitions(partitions, max_workers=None):
+    """
+    Aggregate partitions of the sales data in a pool of worker processes and merge the results.
+
+    All the aggregates are sums and counts (averages are derived from them afterwards), so merging
+    the partitions gives the same result as aggregating all of the data in a single process.
+    """
+    aggregates = SalesAggregates()
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        for partition_aggregates in executor.map(SalesAggregates.from_frame, partitions):
+            aggregates.merge(partition_aggregates)
+
+    return aggregates
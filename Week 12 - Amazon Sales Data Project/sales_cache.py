@@ -0,0 +1,105 @@
+import hashlib
+import os
+
+try:
+    import pyarrow as pa
+except ImportError:  # The cache is optional, the CSV file is parsed when pyarrow is not installed
+    pa = None
+
+# Bump when the renamed/pre-processed schema changes, so caches written by older code are ignored
+CACHE_VERSION = '1'
+
+
+def cache_path(csv_path):
+    """Path of the Arrow cache file written next to the CSV file"""
+    return os.path.splitext(csv_path)[0] + '.arrow'
+
+
+def file_sha256(path):
+    """SHA-256 hash of a file's content, read in 1MB blocks"""
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+def _source_metadata(csv_path):
+    stat = os.stat(csv_path)
+
+    return {
+        'cache_version': CACHE_VERSION,
+        'source_mtime_ns': str(stat.st_mtime_ns),
+        'source_size': str(stat.st_size),
+        'source_sha256': file_sha256(csv_path),
+    }
+
+
+def _is_fresh(metadata, csv_path):
+    """
+    Check whether a cache still matches its source CSV file.
+
+    An unchanged modification time and size are trusted without reading the file. Otherwise
+    the content hash decides, so a file that was only touched keeps its cache.
+    """
+    if metadata.get('cache_version') != CACHE_VERSION:
+        return False
+
+    stat = os.stat(csv_path)
+
+    if metadata.get('source_mtime_ns') == str(stat.st_mtime_ns) and metadata.get('source_size') == str(stat.st_size):
+        return True
+
+    return metadata.get('source_sha256') == file_sha256(csv_path)
+
+
+def load_cached_frame(csv_path):
+    """
+    Load the pre-processed dataframe of `csv_path` from its Arrow cache.
+
+    The cache file is memory-mapped instead of read. Returns None when pyarrow is not installed
+    or when there is no cache that matches the current content of the CSV file.
+    """
+    path = cache_path(csv_path)
+
+    if pa is None or not os.path.exists(path) or not os.path.exists(csv_path):
+        return None
+
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+    except pa.ArrowInvalid:
+        return None
+
+    metadata = {key.decode(): value.decode() for key, value in (reader.schema.metadata or {}).items()}
+
+    if not _is_fresh(metadata, csv_path):
+        return None
+
+    return reader.read_all().to_pandas()
+
+
+def write_cached_frame(csv_path, df):
+    """Write the pre-processed dataframe of `csv_path` to its Arrow cache, if pyarrow is installed"""
+    if pa is None:
+        return None
+
+    path = cache_path(csv_path)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        **_source_metadata(csv_path),
+    })
+
+    # Write to a temporary file first so a crash never leaves a half-written cache behind
+    temporary_path = f'{path}.tmp'
+
+    with pa.OSFile(temporary_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    os.replace(temporary_path, path)
+
+    return path
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+# Fingerprints of the rendered charts of a directory, used to skip charts whose data has not changed
+MANIFEST_NAME = '.charts.json'
+
+
+def draw_status_distribution(status_distribution):
+    """Create a pie chart for order status distribution"""
+    fig, ax = plt.subplots(figsize=(10, 8))
+
+    # Create pie chart
+    wedges, texts, autotexts = ax.pie(
+        list(status_distribution.values()),
+        labels=list(status_distribution.keys()),
+        autopct='%1.1f%%',
+        startangle=90,
+        explode=[0.05 if status == 'Cancelled' else 0 for status in status_distribution.keys()],
+    )
+
+    ax.set_title('Order Status Distribution', fontsize=16, fontweight='bold', pad=20)
+
+    plt.tight_layout()
+
+    return fig
+
+
+def draw_dashboard(products_revenue, payment_revenue, location_revenue, category_revenue):
+    """Create the four panels of the sales dashboard from the revenue per product, payment method, location and category"""
+
+    # Setup of the plot environment
+    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(25, 20))
+    fig.suptitle('Amazon Sales Analytics', fontsize=16, fontweight='bold')
+
+    # Top products by revenue
+    axes[0, 0].barh(range(len(products_revenue)), products_revenue.values)
+    axes[0, 0].set_yticks(range(len(products_revenue)))
+    axes[0, 0].set_yticklabels(products_revenue.index)
+    axes[0, 0].set_title('Top Products By Revenue')
+    axes[0, 0].grid()
+
+    # Payment method
+    axes[0, 1].pie(payment_revenue.values, labels=payment_revenue.index, autopct='%1.1f%%')
+    axes[0, 1].set_title('Revenue by Payment Method')
+
+    # Geographic Distribution
+    location_revenue = location_revenue.nlargest(10)
+    axes[1, 0].bar(range(len(location_revenue)), location_revenue.values)
+    axes[1, 0].set_xticks(range(len(location_revenue)))
+    axes[1, 0].set_xticklabels(location_revenue.index, rotation=45, ha='right')
+    axes[1, 0].set_title('Total 10 Markets By Revenue')
+    axes[1, 0].set_ylabel('Revenue ($)')
+
+    # Category Performance
+    axes[1, 1].bar(category_revenue.index, category_revenue.values)
+    axes[1, 1].set_ylabel('Revenue ($)')
+    axes[1, 1].set_title('Revenue by Category')
+    axes[1, 1].grid(axis='y', alpha=0.5, linestyle='--')
+    axes[1, 1].tick_params(axis='x', rotation=45)
+
+    return fig
+
+
+CHARTS = {
+    'status_distribution': draw_status_distribution,
+    'dashboard': draw_dashboard,
+}
+
+
+def chart_path(save_path, fmt=None):
+    """Path of a chart saved in the `fmt` image format (png, svg, pdf, ...)"""
+    if not fmt:
+        return save_path
+
+    return f'{os.path.splitext(save_path)[0]}.{fmt}'
+
+
+def _use_headless_backend():
+    """Switch a worker process to the non-interactive Agg backend, so no window is ever opened"""
+    matplotlib.use('Agg', force=True)
+
+
+def _render(chart, data, save_path, dpi, fmt):
+    fig = CHARTS[chart](**data)
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight', format=fmt)
+    plt.close(fig)
+
+    return save_path
+
+
+def _fingerprint(chart, data, dpi, fmt):
+    return hashlib.sha256(pickle.dumps((chart, data, dpi, fmt))).hexdigest()
+
+
+def _load_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+
+def render_charts(charts, dpi=300, fmt=None, max_workers=None, skip_unchanged=True):
+    """
+    Render charts off-screen, in parallel worker processes.
+
+    `charts` maps the path of every chart to a `(chart, data)` pair, where `chart` is a key of
+    `CHARTS` and `data` the keyword arguments of its draw function (precomputed aggregates).
+    When `skip_unchanged` is set, a chart whose file exists and was rendered from the same data,
+    DPI and format is not rendered again. Returns the paths of the rendered charts.
+    """
+    jobs = {}
+    manifests = {}
+
+    for save_path, (chart, data) in charts.items():
+        save_path = chart_path(save_path, fmt)
+        directory = os.path.dirname(os.path.abspath(save_path))
+        manifest = manifests.setdefault(directory, _load_manifest(directory))
+        fingerprint = _fingerprint(chart, data, dpi, fmt)
+
+        if skip_unchanged and os.path.exists(save_path) and manifest.get(os.path.basename(save_path)) == fingerprint:
+            continue
+
+        jobs[save_path] = (chart, data, fingerprint)
+
+    if not jobs:
+        return []
+
+    with ProcessPoolExecutor(max_workers, initializer=_use_headless_backend) as executor:
+        futures = {
+            save_path: executor.submit(_render, chart, data, save_path, dpi, fmt)
+            for save_path, (chart, data, fingerprint) in jobs.items()
+        }
+
+        for save_path, future in futures.items():
+            future.result()
+
+            directory = os.path.dirname(os.path.abspath(save_path))
+            manifests[directory][os.path.basename(save_path)] = jobs[save_path][2]
+
+    for directory, manifest in manifests.items():
+        _save_manifest(directory, manifest)
+
+    return list(jobs)
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+# Columns that can be filtered on in queries
+FILTER_COLUMNS = ['product', 'location', 'payment_method', 'status']
+
+
+def _cumulative(values):
+    """Cumulative sums with a leading zero: the sum of `values[a:b]` is `cumulative[b] - cumulative[a]`"""
+    return np.concatenate([[0], np.cumsum(values)])
+
+
+class SalesIndex:
+    """
+    Pre-built indexes over the sales data, to answer revenue questions without scanning the data.
+
+    The orders are sorted by date once, and the filter columns are stored as integer category codes.
+    For every filter column, the row positions are grouped by value (still in date order within a
+    value), with cumulative sums of revenue and quantity in that order. All indexes are built up
+    front, one per column, whatever the queries.
+
+    - Without filters or with a single filter, a date range comes down to binary searches and two
+      differences of cumulative sums.
+    - With several filters, the orders of the most selective filter in the date range (found the
+      same way) are checked against the codes of the other filters, so the cost grows with the
+      orders of that filter only.
+    """
+
+    def __init__(self, df):
+        order = np.argsort(df['date'].to_numpy(), kind='stable')
+        sorted_df = df.iloc[order]
+
+        self.dates = sorted_df['date'].to_numpy()
+        self.sales = sorted_df['total_sales'].to_numpy(dtype='float64', na_value=0)
+        self.qty = sorted_df['qty'].to_numpy(dtype='float64', na_value=0)
+
+        self.cumulative_sales = _cumulative(self.sales)
+        self.cumulative_qty = _cumulative(self.qty)
+
+        self.codes = {}
+        self.categories = {}
+        # Per filter column: the row positions grouped by code, where each code starts in them, and
+        # the cumulative sums of revenue and quantity in that order
+        self.positions = {}
+        self.starts = {}
+        self.grouped_sales = {}
+        self.grouped_qty = {}
+
+        for column in FILTER_COLUMNS:
+            categorical = pd.Categorical(sorted_df[column])
+            codes = categorical.codes
+            self.codes[column] = codes
+            self.categories[column] = {value: code for code, value in enumerate(categorical.categories)}
+
+            # A stable sort keeps the positions of every code in increasing (date) order
+            positions = np.argsort(codes, kind='stable')
+            self.positions[column] = positions
+            self.starts[column] = np.searchsorted(codes[positions], np.arange(len(categorical.categories) + 1))
+            self.grouped_sales[column] = _cumulative(self.sales[positions])
+            self.grouped_qty[column] = _cumulative(self.qty[positions])
+
+    def _code(self, column, value):
+        """Category code of a value, or None when the value doesn't appear in the data"""
+        return self.categories[column].get(value)
+
+    def _rows(self, start, end):
+        """Range of the date-sorted rows dated between `start` and `end` (both included)"""
+        first = 0 if start is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start)), side='left')
+        last = len(self.dates) if end is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end)), side='right')
+
+        return first, max(first, last)
+
+    def _group_range(self, column, code, first, last):
+        """Range, in `positions[column]`, of the rows with `code` among the rows `first` to `last`"""
+        group_start, group_end = self.starts[column][code], self.starts[column][code + 1]
+        group = self.positions[column][group_start:group_end]
+
+        return (group_start + np.searchsorted(group, first, side='left'),
+                group_start + np.searchsorted(group, last, side='left'))
+
+    def query(self, start=None, end=None, **filters):
+        """
+        Revenue, units sold and order count of the orders matching all `filters` (e.g.
+        `product='Laptop', location='Miami'`) and dated between `start` and `end` (both included).
+        """
+        codes = {}
+
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f'Cannot filter on `{column}`, use one of: {', '.join(FILTER_COLUMNS)}')
+
+            codes[column] = self._code(column, value)
+
+            if codes[column] is None:
+                return {'revenue': 0.0, 'units_sold': 0.0, 'order_count': 0}
+
+        first, last = self._rows(start, end)
+
+        if not codes:
+            return {
+                'revenue': float(self.cumulative_sales[last] - self.cumulative_sales[first]),
+                'units_sold': float(self.cumulative_qty[last] - self.cumulative_qty[first]),
+                'order_count': int(last - first),
+            }
+
+        ranges = {column: self._group_range(column, code, first, last) for column, code in codes.items()}
+        column = min(ranges, key=lambda column: ranges[column][1] - ranges[column][0])
+        begin, end = ranges[column]
+
+        if len(codes) == 1:
+            return {
+                'revenue': float(self.grouped_sales[column][end] - self.grouped_sales[column][begin]),
+                'units_sold': float(self.grouped_qty[column][end] - self.grouped_qty[column][begin]),
+                'order_count': int(end - begin),
+            }
+
+        # The orders of the most selective filter that match the other filters too
+        rows = self.positions[column][begin:end]
+        matches = np.ones(len(rows), dtype=bool)
+
+        for other, code in codes.items():
+            if other != column:
+                matches &= self.codes[other][rows] == code
+
+        rows = rows[matches]
+
+        return {
+            'revenue': float(self.sales[rows].sum()),
+            'units_sold': float(self.qty[rows].sum()),
+            'order_count': int(len(rows)),
+        }
+
+    def revenue(self, start=None, end=None, **filters):
+        """Revenue of the orders matching `filters` between `start` and `end` (see `query`)"""
+        return self.query(start, end, **filters)['revenue']
+
+    def week_range(self, week, year):
+        """First and last day of an ISO week, to query a week: `query(*index.week_range(12, 2025))`"""
+        start = pd.Timestamp.fromisocalendar(year, week, 1)
+
+        return start, start + pd.Timedelta(days=6)
@@ -0,0 +1,76 @@
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+
+def to_records(value):
+    """
+    Convert the results of the analyses to plain Python types.
+
+    DataFrames become `{row: {column: value}}` dicts, numpy scalars become ints, floats and bools,
+    dates become ISO strings and NaN/infinite floats become None, so the result is valid JSON.
+    """
+    if isinstance(value, pd.DataFrame):
+        value = value.to_dict('index')
+    elif isinstance(value, pd.Series):
+        value = value.to_dict()
+
+    if isinstance(value, dict):
+        return {str(key): to_records(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple, pd.Index, np.ndarray)):
+        return [to_records(item) for item in value]
+
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(value).isoformat()
+
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+
+    return value
+
+
+def flatten_report(report):
+    """
+    Flatten a report to one row per KPI: the section of the report, the path of the KPI within
+    the section and its value (as a number, or as text for the non-numeric KPIs).
+    """
+    rows = []
+
+    def visit(section, path, value):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                visit(section, path + [key], item)
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                visit(section, path + [str(index)], item)
+        else:
+            is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            rows.append({
+                'section': section,
+                'kpi': '.'.join(path),
+                'value': float(value) if is_number else None,
+                'text': None if is_number or value is None else str(value),
+            })
+
+    for section, results in to_records(report).items():
+        visit(section, [], results)
+
+    return pd.DataFrame(rows, columns=['section', 'kpi', 'value', 'text'])
+
+
+def save_report(report, path):
+    """Save a report as JSON or, for a `.parquet` path, as a Parquet table of KPIs (see `flatten_report`)"""
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        flatten_report(report).to_parquet(path, index=False)
+    else:
+        with open(path, 'w') as file:
+            json.dump(to_records(report), file, indent=2, ensure_ascii=False)
+
+    return path
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules of the week and the data generators are imported by name, like the scripts do
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(HERE), os.path.join(HERE, '..', '..', 'data')]
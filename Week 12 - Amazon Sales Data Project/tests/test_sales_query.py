@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_amazon_sales_data import generate_amazon_sales_data
+from sales_query import SalesIndex
+
+
+@pytest.fixture(scope='module')
+def sales():
+    df = generate_amazon_sales_data(5_000, skew=1.2, seed=7).rename(columns={
+        'Date': 'date',
+        'Product': 'product',
+        'Quantity': 'qty',
+        'Total Sales': 'total_sales',
+        'Customer Location': 'location',
+        'Payment Method': 'payment_method',
+        'Status': 'status',
+    })
+    df['date'] = pd.to_datetime(df['date'], format='%d-%m-%y')
+
+    return df
+
+
+def brute_force(df, start=None, end=None, **filters):
+    """The same query, scanning every row"""
+    mask = np.ones(len(df), dtype=bool)
+
+    if start is not None:
+        mask &= df['date'] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df['date'] <= pd.Timestamp(end)
+    for column, value in filters.items():
+        mask &= df[column] == value
+
+    return {
+        'revenue': float(df.loc[mask, 'total_sales'].sum()),
+        'units_sold': float(df.loc[mask, 'qty'].sum()),
+        'order_count': int(mask.sum()),
+    }
+
+
+def test_queries_match_a_scan_of_the_data(sales):
+    index = SalesIndex(sales)
+    rng = np.random.default_rng(0)
+    products, locations = sales['product'].unique(), sales['location'].unique()
+
+    days = pd.date_range('2025-01-25', '2025-05-05')
+
+    queries = [{}, {'start': '2025-03-01'}, {'end': '2025-03-01'}, {'start': '2025-03-10', 'end': '2025-03-10'}]
+    for _ in range(50):
+        start, end = np.sort(rng.choice(days, size=2))
+        queries += [
+            {'start': start, 'end': end, 'product': rng.choice(products)},
+            {'start': start, 'end': end, 'product': rng.choice(products), 'location': rng.choice(locations)},
+            {'start': start, 'end': end, 'location': rng.choice(locations), 'payment_method': 'PayPal',
+             'status': 'Completed'},
+        ]
+
+    for query in queries:
+        expected = brute_force(sales, **query)
+        result = index.query(**query)
+
+        assert result['order_count'] == expected['order_count'], query
+        assert result['revenue'] == pytest.approx(expected['revenue']), query
+        assert result['units_sold'] == pytest.approx(expected['units_sold']), query
+
+
+def test_revenue_with_date_range_and_filters(sales):
+    index = SalesIndex(sales)
+    product, location = sales['product'].iloc[0], sales['location'].iloc[0]
+
+    assert index.revenue() == pytest.approx(sales['total_sales'].sum())
+    assert index.revenue('2025-02-10', '2025-03-20', product=product) == pytest.approx(
+        brute_force(sales, '2025-02-10', '2025-03-20', product=product)['revenue'])
+    assert index.revenue('2025-02-10', '2025-03-20', product=product, location=location) == pytest.approx(
+        brute_force(sales, '2025-02-10', '2025-03-20', product=product, location=location)['revenue'])
+
+
+def test_unknown_values_and_empty_ranges(sales):
+    index = SalesIndex(sales)
+
+    assert index.query(product='Unknown product') == {'revenue': 0.0, 'units_sold': 0.0, 'order_count': 0}
+    assert index.query('2025-03-20', '2025-03-10')['order_count'] == 0
+    assert index.revenue('2030-01-01', product=sales['product'].iloc[0]) == 0.0
+
+    with pytest.raises(ValueError):
+        index.query(category='Electronics')
@@ -0,0 +1,141 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Products of the real dataset, with their category and price
+PRODUCTS = [
+    ('Book', 'Books', 15),
+    ('Headphones', 'Electronics', 100),
+    ('Jeans', 'Clothing', 40),
+    ('Laptop', 'Electronics', 800),
+    ('Refrigerator', 'Home Appliances', 1200),
+    ('Running Shoes', 'Footwear', 60),
+    ('Smartphone', 'Electronics', 500),
+    ('Smartwatch', 'Electronics', 150),
+    ('T-Shirt', 'Clothing', 20),
+    ('Washing Machine', 'Home Appliances', 600),
+]
+
+LOCATIONS = [
+    'New York', 'San Francisco', 'Denver', 'Dallas', 'Houston',
+    'Miami', 'Boston', 'Seattle', 'Los Angeles', 'Chicago',
+]
+
+CUSTOMERS = [
+    'Emma Clark', 'Emily Johnson', 'John Doe', 'Olivia Wilson', 'Sophia Miller',
+    'David Lee', 'Michael Brown', 'Daniel Harris', 'Chris White', 'Jane Smith',
+]
+
+PAYMENT_METHODS = ['Debit Card', 'Amazon Pay', 'Credit Card', 'PayPal', 'Gift Card']
+
+STATUSES = ['Cancelled', 'Pending', 'Completed']
+
+CATEGORIES = sorted({category for _, category, _ in PRODUCTS})
+
+
+def skewed_weights(n, skew):
+    """Zipf-like popularity weights: the i-th value is picked in proportion to 1 / i^skew (0 = uniform)"""
+    weights = 1 / np.arange(1, n + 1) ** skew
+
+    return weights / weights.sum()
+
+
+def build_catalog(n_products, n_locations, seed=42):
+    """
+    Products (with category and price) and locations to generate orders for.
+
+    The products and locations of the real dataset come first; when more are requested, numbered
+    ones are added ("Product 11", "Location 11", ...) with a random category and price.
+    """
+    rng = np.random.default_rng(seed)
+
+    products = list(PRODUCTS[:n_products])
+    for number in range(len(products) + 1, n_products + 1):
+        products.append((f'Product {number}', CATEGORIES[rng.integers(len(CATEGORIES))], int(rng.integers(5, 2000))))
+
+    locations = LOCATIONS[:n_locations]
+    locations += [f'Location {number}' for number in range(len(locations) + 1, n_locations + 1)]
+
+    return products, locations
+
+
+def generate_amazon_sales_data(n_records, n_products=10, n_locations=10, skew=1.0, seed=42,
+                               start_date='2025-02-01', end_date='2025-04-30', first_order=1):
+    """
+    Generate synthetic orders with the columns and formats of `amazon_sales_data_2025.csv`.
+
+    Every column is drawn at once with numpy, so millions of rows take seconds. Products and locations
+    are picked with Zipf-like popularity (`skew`, 0 for uniform), and orders are numbered from
+    `first_order`, so consecutive chunks of a large file can be generated separately.
+    """
+    rng = np.random.default_rng(seed)
+    products, locations = build_catalog(n_products, n_locations)
+
+    product_codes = rng.choice(len(products), size=n_records, p=skewed_weights(len(products), skew))
+    location_codes = rng.choice(len(locations), size=n_records, p=skewed_weights(len(locations), skew))
+
+    names, categories, prices = (np.array(values) for values in zip(*products))
+    quantities = rng.integers(1, 6, size=n_records)
+
+    # Format every day of the date range once, then pick the formatted days
+    days = pd.date_range(start_date, end_date, freq='D')
+    day_labels = days.strftime('%d-%m-%y').to_numpy()
+
+    order_numbers = pd.Series(np.arange(first_order, first_order + n_records)).astype(str).str.zfill(4)
+
+    return pd.DataFrame({
+        'Order ID': 'ORD' + order_numbers,
+        'Date': day_labels[rng.integers(len(days), size=n_records)],
+        'Product': names[product_codes],
+        'Category': categories[product_codes],
+        'Price': prices[product_codes],
+        'Quantity': quantities,
+        'Total Sales': prices[product_codes] * quantities,
+        'Customer Name': np.array(CUSTOMERS)[rng.integers(len(CUSTOMERS), size=n_records)],
+        'Customer Location': np.array(locations)[location_codes],
+        'Payment Method': np.array(PAYMENT_METHODS)[rng.integers(len(PAYMENT_METHODS), size=n_records)],
+        'Status': np.array(STATUSES)[rng.integers(len(STATUSES), size=n_records)],
+    })
+
+
+def write_amazon_sales_data(path, n_records, chunk_size=1_000_000, seed=42, **options):
+    """
+    Write `n_records` synthetic orders to a CSV (or `.parquet`) file, one chunk of rows at a time,
+    so files of 100M rows can be generated with the memory of a single chunk.
+
+    `options` are passed to `generate_amazon_sales_data`.
+    """
+    is_parquet = os.path.splitext(path)[1].lower() == '.parquet'
+    writer = None
+
+    for chunk_number, first_row in enumerate(range(0, n_records, chunk_size)):
+        chunk = generate_amazon_sales_data(
+            min(chunk_size, n_records - first_row),
+            seed=seed + chunk_number,
+            first_order=first_row + 1,
+            **options,
+        )
+
+        if is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        else:
+            chunk.to_csv(path, index=False, mode='w' if first_row == 0 else 'a', header=first_row == 0)
+
+    if writer:
+        writer.close()
+
+    return path
+
+
+def main():
+    # 100,000 orders for 50 products in 25 locations
+    write_amazon_sales_data('amazon_sales_data_synthetic.csv', 100_000, n_products=50, n_locations=25)
+
+if __name__ == '__main__':
+    main()
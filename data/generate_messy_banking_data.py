@@ -1,222 +1,313 @@
-import random
-from datetime import datetime, timedelta
+import os
 
+import numpy as np
 import pandas as pd
 
-def generate_messy_banking_data(n_records=150):
+# Nigerian names for realistic context
+NIGERIAN_FIRST_NAMES = [
+    'Adebayo', 'Amara', 'Chidi', 'Emeka', 'Fatima', 'Grace', 'Ibrahim', 'Joy',
+    'Kemi', 'Lawal', 'Musa', 'Ngozi', 'Olumide', 'Peace', 'Rasheed', 'Sarah',
+    'Tunde', 'Uche', 'Victor', 'Yemi', 'Zainab', 'Ahmed', 'Blessing', 'Daniel',
+    'Esther', 'Felix', 'Halima', 'Isaac', 'Janet', 'Kingsley', 'Lydia', 'Moses',
+    'Nkem', 'Ola', 'Patricia', 'Queen', 'Raymond', 'Stella', 'Timothy', 'Uma'
+]
+
+NIGERIAN_LAST_NAMES = [
+    'Adebayo', 'Okafor', 'Nwachukwu', 'Abubakar', 'Williams', 'Johnson', 'Eze',
+    'Adeyemi', 'Ibrahim', 'Okonkwo', 'Musa', 'Adewale', 'Nwosu', 'Hassan',
+    'Ogbonna', 'Yakubu', 'Okoro', 'Bello', 'Chioma', 'Danjuma', 'Emeka',
+    'Garba', 'Igwe', 'Jibril', 'Kalu', 'Lawal', 'Mahmud', 'Nnadi', 'Osei',
+    'Patel', 'Qasim', 'Raji', 'Sani', 'Taiwo', 'Usman', 'Wale', 'Yusuf'
+]
+
+NIGERIAN_STATES = [
+    'Lagos', 'Abuja', 'Rivers', 'Kano', 'Ogun', 'Kaduna', 'Oyo', 'Delta',
+    'Edo', 'Anambra', 'Imo', 'Abia', 'Enugu', 'Cross River', 'Akwa Ibom',
+    'Osun', 'Ondo', 'Ekiti', 'Kwara', 'Niger', 'Benue', 'Plateau', 'Taraba',
+    'Adamawa', 'Borno', 'Yobe', 'Bauchi', 'Gombe', 'Jigawa', 'Katsina',
+    'Kebbi', 'Sokoto', 'Zamfara', 'Nasarawa', 'Kogi', 'Bayelsa', 'Ebonyi'
+]
+
+EMPLOYMENT_TYPES = ['Government', 'Private', 'Self-employed', 'Student', 'Retired']
+# EMPLOYMENT_TYPES = ['Government', 'Private', 'Self-employed', 'Student', 'Retired', 'Public Servant']
+
+ACCOUNT_TYPES = ['Savings', 'Current', 'Fixed Deposit', 'Student']
+
+MARITAL_STATUSES = ['Single', 'Married', 'Divorced', 'Widowed']
+
+MARITAL_STATUS_VARIATIONS = {
+    'Single': ['single', 'SINGLE', 'S', 'Not Married'],
+    'Married': ['married', 'MARRIED', 'M', 'Wed'],
+    'Divorced': ['divorced', 'DIVORCED', 'D', 'Separated'],
+    'Widowed': ['widowed', 'WIDOWED', 'W', 'Widow']
+}
+
+EDUCATION_LEVELS = ['Primary', 'Secondary', 'University', 'Masters', 'PhD']
+
+IMPOSSIBLE_AGES = [150, 200, -5, 0, 300]
+IMPOSSIBLE_CREDIT_SCORES = [1000, -100, 2000]
+LOAN_WORDS = ['None', 'Many', 'Few', 'Several']
+
+# Share of the records with each data quality issue. As in the original record-by-record generator,
+# each rate applies to the records that don't already have the previous issue of the same column
+# (e.g. 3% of the customer IDs that are not missing are malformed)
+DEFECT_RATES = {
+    'missing_id': 0.05,
+    'malformed_id': 0.03,
+    'missing_name': 0.03,
+    'name_formatting': 0.05,
+    'missing_age': 0.04,
+    'impossible_age': 0.02,
+    'state_formatting': 0.15,
+    'missing_income': 0.08,
+    'income_currency_text': 0.05,
+    'income_text': 0.03,
+    'negative_balance': 0.02,
+    'extreme_balance': 0.01,
+    'missing_phone': 0.05,
+    'phone_formatting': 0.2,
+    'loan_history': 0.7,
+    'loan_text': 0.05,
+    'marital_status_formatting': 0.1,
+    'date_formatting': 0.1,
+    'impossible_credit_score': 0.02,
+    'missing_credit_score': 0.05,
+    # Records added again as duplicates, with a phone or name variation
+    'duplicate': 0.05,
+}
+
+
+def _pick(rng, values, size):
+    return np.array(values, dtype=object)[rng.integers(len(values), size=size)]
+
+
+def _state_variations():
+    """The five badly formatted spellings of every state, one row per state"""
+    return np.array([[
+        state.upper(),
+        state.lower(),
+        state[:3] if len(state) > 3 else state,
+        f"{state[:2]}.{state[2:4].upper()}." if len(state) > 4 else state,
+        f"  {state}  ",
+    ] for state in NIGERIAN_STATES], dtype=object)
+
+
+def _add_duplicates(df, rng, rate):
+    """Add copies of random records, some with the phone number in international format or a shortened name"""
+    n_duplicates = int(round(len(df) * rate))
+    duplicates = df.iloc[rng.choice(len(df), size=n_duplicates, replace=False)].copy()
+
+    # Same person, different phone format
+    phones = duplicates['phone_number']
+    change_phone = phones.notna().to_numpy() & (rng.random(n_duplicates) < 0.5)
+    change_phone &= phones.astype(str).str.startswith('080').to_numpy()
+    duplicates.loc[change_phone, 'phone_number'] = '+234' + phones[change_phone].str[1:]
+
+    # Slight name variation: "Adebayo Okafor" -> "Adebayo Oka."
+    names = duplicates['full_name'].str.split()
+    change_name = (rng.random(n_duplicates) < 0.3) & (names.str.len() >= 2).to_numpy()
+    duplicates.loc[change_name, 'full_name'] = names[change_name].str[0] + ' ' + names[change_name].str[1].str[:3] + '.'
+
+    return pd.concat([df, duplicates], ignore_index=True)
+
+
+def generate_messy_banking_data(n_records=150, seed=None, rates=None, first_customer=1):
     """
     Generate a realistic Nigerian banking dataset with common data quality issues
     that students will need to clean and prepare for machine learning.
-    """
 
-    # Nigerian names for realistic context
-    nigerian_first_names = [
-        'Adebayo', 'Amara', 'Chidi', 'Emeka', 'Fatima', 'Grace', 'Ibrahim', 'Joy',
-        'Kemi', 'Lawal', 'Musa', 'Ngozi', 'Olumide', 'Peace', 'Rasheed', 'Sarah',
-        'Tunde', 'Uche', 'Victor', 'Yemi', 'Zainab', 'Ahmed', 'Blessing', 'Daniel',
-        'Esther', 'Felix', 'Halima', 'Isaac', 'Janet', 'Kingsley', 'Lydia', 'Moses',
-        'Nkem', 'Ola', 'Patricia', 'Queen', 'Raymond', 'Stella', 'Timothy', 'Uma'
-    ]
-
-    nigerian_last_names = [
-        'Adebayo', 'Okafor', 'Nwachukwu', 'Abubakar', 'Williams', 'Johnson', 'Eze',
-        'Adeyemi', 'Ibrahim', 'Okonkwo', 'Musa', 'Adewale', 'Nwosu', 'Hassan',
-        'Ogbonna', 'Yakubu', 'Okoro', 'Bello', 'Chioma', 'Danjuma', 'Emeka',
-        'Garba', 'Igwe', 'Jibril', 'Kalu', 'Lawal', 'Mahmud', 'Nnadi', 'Osei',
-        'Patel', 'Qasim', 'Raji', 'Sani', 'Taiwo', 'Usman', 'Wale', 'Yusuf'
-    ]
-
-    nigerian_states = [
-        'Lagos', 'Abuja', 'Rivers', 'Kano', 'Ogun', 'Kaduna', 'Oyo', 'Delta',
-        'Edo', 'Anambra', 'Imo', 'Abia', 'Enugu', 'Cross River', 'Akwa Ibom',
-        'Osun', 'Ondo', 'Ekiti', 'Kwara', 'Niger', 'Benue', 'Plateau', 'Taraba',
-        'Adamawa', 'Borno', 'Yobe', 'Bauchi', 'Gombe', 'Jigawa', 'Katsina',
-        'Kebbi', 'Sokoto', 'Zamfara', 'Nasarawa', 'Kogi', 'Bayelsa', 'Ebonyi'
-    ]
-
-    # Generate base data
-    data = []
-
-    for i in range(n_records):
-        # Create customer ID (some will be missing or malformed)
-        if random.random() < 0.05:  # 5% missing customer IDs
-            customer_id = None
-        elif random.random() < 0.03:  # 3% malformed IDs
-            customer_id = f"CUS{random.randint(1, 999)}"  # Missing leading zeros
-        else:
-            customer_id = f"CUS{i+1:03d}"
+    Every column is drawn at once with numpy, so millions of records take seconds. `rates` overrides
+    some of the `DEFECT_RATES`, `seed` makes the data reproducible, and customers are numbered from
+    `first_customer`, so consecutive chunks of a large file can be generated separately.
+    """
+    rng = np.random.default_rng(seed)
+    rates = {**DEFECT_RATES, **(rates or {})}
+    n = n_records
+
+    def has(issue, among=None):
+        """Records with an issue, drawn among the records of `among` (all records by default)"""
+        drawn = rng.random(n) < rates[issue]
+        return drawn if among is None else drawn & among
+
+    # Create customer ID (some will be missing or malformed)
+    customer_ids = pd.Series(np.arange(first_customer, first_customer + n)).astype(str).str.zfill(3)
+    customer_ids = ('CUS' + customer_ids).to_numpy(dtype=object)
+
+    missing_id = has('missing_id')
+    malformed_id = has('malformed_id', ~missing_id)
+    customer_ids[malformed_id] = 'CUS' + rng.integers(1, 1000, size=malformed_id.sum()).astype(str).astype(object)  # Missing leading zeros
+    customer_ids[missing_id] = None
+
+    # Generate names (some missing, some with extra spaces)
+    first_codes = rng.integers(len(NIGERIAN_FIRST_NAMES), size=n)
+    last_codes = rng.integers(len(NIGERIAN_LAST_NAMES), size=n)
+    first_names = np.array(NIGERIAN_FIRST_NAMES, dtype=object)
+    last_names = np.array(NIGERIAN_LAST_NAMES, dtype=object)
+
+    full_names = first_names[first_codes] + ' ' + last_names[last_codes]
+
+    missing_name = has('missing_name')
+    name_formatting = has('name_formatting', ~missing_name)
+    full_names[name_formatting] = ('  ' + np.char.upper(first_names.astype(str)).astype(object)[first_codes[name_formatting]] +
+                                   ' ' + np.char.lower(last_names.astype(str)).astype(object)[last_codes[name_formatting]] + '  ')
+    full_names[missing_name] = ''
+
+    # Generate ages (with outliers and missing values)
+    ages = rng.integers(18, 81, size=n).astype('float64')
+
+    missing_age = has('missing_age')
+    impossible_age = has('impossible_age', ~missing_age)
+    ages[impossible_age] = _pick(rng, IMPOSSIBLE_AGES, impossible_age.sum())
+    ages[missing_age] = np.nan
+
+    # Generate states (with inconsistent formatting)
+    state_codes = rng.integers(len(NIGERIAN_STATES), size=n)
+    states = np.array(NIGERIAN_STATES, dtype=object)[state_codes]
+
+    state_formatting = has('state_formatting')
+    states[state_formatting] = _state_variations()[state_codes[state_formatting], rng.integers(5, size=state_formatting.sum())]
+
+    # Generate income (with missing values and wrong data types)
+    base_incomes = rng.integers(30000, 500001, size=n)
+    incomes = base_incomes.astype(object)
+
+    missing_income = has('missing_income')
+    currency_text = has('income_currency_text', ~missing_income)
+    plain_text = has('income_text', ~missing_income & ~currency_text)
+    incomes[currency_text] = pd.Series(base_incomes[currency_text]).map('₦{:,}'.format).to_numpy(dtype=object)
+    incomes[plain_text] = base_incomes[plain_text].astype(str).astype(object)
+    incomes[missing_income] = None
+
+    # Generate account balance (with negative outliers)
+    balances = rng.integers(1000, 5000001, size=n)
+
+    negative_balance = has('negative_balance')
+    extreme_balance = has('extreme_balance', ~negative_balance)
+    balances[negative_balance] = rng.integers(-1000000, -99999, size=negative_balance.sum())
+    balances[extreme_balance] = rng.integers(50000000, 100000001, size=extreme_balance.sum())
+
+    # Generate phone numbers (various formats)
+    base_phones = pd.Series(rng.integers(10000000, 100000000, size=n)).astype(str)
+    base_phones = '080' + base_phones
+    phones = base_phones.to_numpy(dtype=object)
+
+    missing_phone = has('missing_phone')
+    phone_formatting = has('phone_formatting', ~missing_phone)
+    reformatted = base_phones[phone_formatting]
+    variants = np.column_stack([
+        '+234' + reformatted.str[1:],
+        reformatted.str[:4] + '-' + reformatted.str[4:7] + '-' + reformatted.str[7:],
+        reformatted.str[:4] + ' ' + reformatted.str[4:7] + ' ' + reformatted.str[7:],
+        reformatted.str[1:],  # Missing leading 0
+        '0' + reformatted.str[3:],  # Different provider code
+    ])
+    phones[phone_formatting] = variants[np.arange(len(variants)), rng.integers(5, size=len(variants))]
+    phones[missing_phone] = None
+
+    # Generate loan history (some with inconsistent values)
+    loans = np.zeros(n, dtype=object)
+
+    loan_history = has('loan_history')
+    loan_text = has('loan_text', loan_history)
+    loans[loan_history] = rng.integers(0, 6, size=loan_history.sum())
+    loans[loan_text] = _pick(rng, LOAN_WORDS, loan_text.sum())
+
+    # Generate marital status (with inconsistent formatting)
+    marital_codes = rng.integers(len(MARITAL_STATUSES), size=n)
+    marital_statuses = np.array(MARITAL_STATUSES, dtype=object)[marital_codes]
+
+    marital_formatting = has('marital_status_formatting')
+    variations = np.array([MARITAL_STATUS_VARIATIONS[status] for status in MARITAL_STATUSES], dtype=object)
+    marital_statuses[marital_formatting] = variations[marital_codes[marital_formatting], rng.integers(4, size=marital_formatting.sum())]
+
+    # Generate registration date (some with wrong formats)
+    # Every day of the period is formatted once, and the records pick their day (and format) in the table
+    calendar = pd.date_range('2015-01-01', '2024-12-31')
+    days = rng.integers(len(calendar), size=n)
+    dates = np.array(calendar.strftime('%Y-%m-%d'), dtype=object)[days]
+
+    date_formatting = has('date_formatting')
+    wrong_formats = np.column_stack([
+        calendar.strftime('%d/%m/%Y'),
+        calendar.strftime('%m-%d-%Y'),
+        calendar.strftime('%d-%b-%Y'),
+        calendar.strftime('%Y/%m/%d'),
+        np.full(len(calendar), 'Invalid Date'),
+        np.full(len(calendar), ''),
+    ]).astype(object)
+    dates[date_formatting] = wrong_formats[days[date_formatting], rng.integers(6, size=date_formatting.sum())]
+
+    # Generate credit score (with some outliers)
+    credit_scores = rng.integers(300, 851, size=n).astype('float64')
+
+    impossible_score = has('impossible_credit_score')
+    missing_score = has('missing_credit_score', ~impossible_score)
+    credit_scores[impossible_score] = _pick(rng, IMPOSSIBLE_CREDIT_SCORES, impossible_score.sum())
+    credit_scores[missing_score] = np.nan
+
+    df = pd.DataFrame({
+        'customer_id': customer_ids,
+        'full_name': full_names,
+        'age': ages,
+        'state': states,
+        'monthly_income': incomes,
+        'account_balance': balances,
+        'phone_number': phones,
+        'employment_type': _pick(rng, EMPLOYMENT_TYPES, n),
+        'account_type': _pick(rng, ACCOUNT_TYPES, n),
+        'previous_loans': loans,
+        'marital_status': marital_statuses,
+        'education_level': _pick(rng, EDUCATION_LEVELS, n),
+        'registration_date': dates,
+        'credit_score': credit_scores,
+    })
+
+    # Introduce some duplicate records
+    df = _add_duplicates(df, rng, rates['duplicate'])
 
-        # Generate names (some missing, some with extra spaces)
-        first_name = random.choice(nigerian_first_names)
-        last_name = random.choice(nigerian_last_names)
+    # Shuffle the data
+    df = df.sample(frac=1, random_state=rng).reset_index(drop=True)
 
-        if random.random() < 0.03:  # 3% missing names
-            full_name = ""
-        elif random.random() < 0.05:  # 5% with formatting issues
-            full_name = f"  {first_name.upper()} {last_name.lower()}  "
-        else:
-            full_name = f"{first_name} {last_name}"
+    return df
 
-        # Generate ages (with outliers and missing values)
-        if random.random() < 0.04:  # 4% missing ages
-            age = None
-        elif random.random() < 0.02:  # 2% with impossible ages
-            age = random.choice([150, 200, -5, 0, 300])
-        else:
-            age = random.randint(18, 80)
-
-        # Generate states (with inconsistent formatting)
-        state = random.choice(nigerian_states)
-        if random.random() < 0.15:  # 15% with formatting issues
-            variations = [
-                state.upper(),
-                state.lower(),
-                state[:3] if len(state) > 3 else state,
-                f"{state[:2]}.{state[2:4].upper()}." if len(state) > 4 else state,
-                f"  {state}  "
-            ]
-            state = random.choice(variations)
-
-        # Generate income (with missing values and wrong data types)
-        base_income = random.randint(30000, 500000)
-        if random.random() < 0.08:  # 8% missing income
-            income = None
-        elif random.random() < 0.05:  # 5% as strings with formatting
-            income = f"₦{base_income:,}"
-        elif random.random() < 0.03:  # 3% as strings without formatting
-            income = str(base_income)
-        else:
-            income = base_income
 
-        # Generate account balance (with negative outliers)
-        if random.random() < 0.02:  # 2% with impossible negative balances
-            balance = random.randint(-1000000, -100000)
-        elif random.random() < 0.01:  # 1% with extreme positive outliers
-            balance = random.randint(50000000, 100000000)
-        else:
-            balance = random.randint(1000, 5000000)
-
-        # Generate phone numbers (various formats)
-        base_phone = f"080{random.randint(10000000, 99999999)}"
-        if random.random() < 0.05:  # 5% missing phones
-            phone = None
-        elif random.random() < 0.2:  # 20% with different formats
-            formats = [
-                f"+234{base_phone[1:]}",
-                f"{base_phone[:4]}-{base_phone[4:7]}-{base_phone[7:]}",
-                f"{base_phone[:4]} {base_phone[4:7]} {base_phone[7:]}",
-                base_phone[1:],  # Missing leading 0
-                f"0{base_phone[3:]}"  # Different provider code
-            ]
-            phone = random.choice(formats)
-        else:
-            phone = base_phone
-
-        # Generate employment type
-        employment_types = ['Government', 'Private', 'Self-employed', 'Student', 'Retired']
-        # employment_types = ['Government', 'Private', 'Self-employed', 'Student', 'Retired', 'Public Servant']
-        employment = random.choice(employment_types)
-
-        # Generate account type
-        account_types = ['Savings', 'Current', 'Fixed Deposit', 'Student']
-        account_type = random.choice(account_types)
-
-        # Generate loan history (some with inconsistent values)
-        if random.random() < 0.7:  # 70% have loan history
-            loans_taken = random.randint(0, 5)
-            if random.random() < 0.05:  # 5% with text instead of numbers
-                loans_taken = random.choice(['None', 'Many', 'Few', 'Several'])
-        else:
-            loans_taken = 0
-
-        # Generate marital status (with inconsistent formatting)
-        marital_statuses = ['Single', 'Married', 'Divorced', 'Widowed']
-        marital_status = random.choice(marital_statuses)
-        if random.random() < 0.1:  # 10% with formatting issues
-            variations = {
-                'Single': ['single', 'SINGLE', 'S', 'Not Married'],
-                'Married': ['married', 'MARRIED', 'M', 'Wed'],
-                'Divorced': ['divorced', 'DIVORCED', 'D', 'Separated'],
-                'Widowed': ['widowed', 'WIDOWED', 'W', 'Widow']
-            }
-            marital_status = random.choice(variations.get(marital_status, [marital_status]))
-
-        # Generate education level
-        education_levels = ['Primary', 'Secondary', 'University', 'Masters', 'PhD']
-        education = random.choice(education_levels)
-
-        # Generate registration date (some with wrong formats)
-        start_date = datetime(2015, 1, 1)
-        end_date = datetime(2024, 12, 31)
-        reg_date = start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-
-        if random.random() < 0.1:  # 10% with wrong date formats
-            date_formats = [
-                reg_date.strftime("%d/%m/%Y"),
-                reg_date.strftime("%m-%d-%Y"),
-                reg_date.strftime("%d-%b-%Y"),
-                reg_date.strftime("%Y/%m/%d"),
-                "Invalid Date",
-                ""
-            ]
-            registration_date = random.choice(date_formats)
-        else:
-            registration_date = reg_date.strftime("%Y-%m-%d")
+def write_messy_banking_data(path, n_records, chunk_size=1_000_000, seed=42, **options):
+    """
+    Write `n_records` messy banking records (plus their duplicates) to a CSV (or `.parquet`) file,
+    one chunk of records at a time, so files of tens of millions of rows can be generated with the
+    memory of a single chunk. Duplicates are copies of records of the same chunk.
 
-        # Generate credit score (with some outliers)
-        if random.random() < 0.02:  # 2% with impossible credit scores
-            credit_score = random.choice([1000, -100, 2000])
-        elif random.random() < 0.05:  # 5% missing
-            credit_score = None
+    `options` are passed to `generate_messy_banking_data`.
+    """
+    is_parquet = os.path.splitext(path)[1].lower() == '.parquet'
+    writer = None
+
+    for chunk_number, first_record in enumerate(range(0, n_records, chunk_size)):
+        chunk = generate_messy_banking_data(
+            min(chunk_size, n_records - first_record),
+            seed=seed + chunk_number,
+            first_customer=first_record + 1,
+            **options,
+        )
+
+        if is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # The mixed columns (numbers and text) are stored as text
+            for column in ['monthly_income', 'previous_loans']:
+                chunk[column] = chunk[column].astype(str).where(chunk[column].notna())
+
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            writer = writer or pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
         else:
-            credit_score = random.randint(300, 850)
-
-        data.append({
-            'customer_id': customer_id,
-            'full_name': full_name,
-            'age': age,
-            'state': state,
-            'monthly_income': income,
-            'account_balance': balance,
-            'phone_number': phone,
-            'employment_type': employment,
-            'account_type': account_type,
-            'previous_loans': loans_taken,
-            'marital_status': marital_status,
-            'education_level': education,
-            'registration_date': registration_date,
-            'credit_score': credit_score
-        })
-
-    # Create DataFrame
-    df = pd.DataFrame(data)
-
-    # Introduce some duplicate records (10-15 duplicates)
-    duplicate_indices = random.sample(range(len(df)), 12)
-    duplicate_rows = df.iloc[duplicate_indices].copy()
-
-    # Modify duplicates slightly to make them realistic
-    for idx, row in duplicate_rows.iterrows():
-        # Same person, different phone or slight name variation
-        if pd.notna(row['phone_number']) and random.random() < 0.5:
-            # Change phone format
-            phone = str(row['phone_number'])
-            if phone.startswith('080'):
-                duplicate_rows.at[idx, 'phone_number'] = f"+234{phone[1:]}"
-
-        if pd.notna(row['full_name']) and random.random() < 0.3:
-            # Slight name variation
-            name_parts = str(row['full_name']).split()
-            if len(name_parts) >= 2:
-                duplicate_rows.at[idx, 'full_name'] = f"{name_parts[0]} {name_parts[1][:3]}."
-
-    # Add duplicates to main dataframe
-    df = pd.concat([df, duplicate_rows], ignore_index=True)
+            chunk.to_csv(path, index=False, mode='w' if first_record == 0 else 'a', header=first_record == 0)
 
-    # Shuffle the data
-    df = df.sample(frac=1).reset_index(drop=True)
+    if writer:
+        writer.close()
 
-    return df
+    return path
 
 
 def main():
@@ -225,5 +316,8 @@ def main():
     # Save to CSV
     banking_df.to_csv('banking_data.csv', index=False)
 
+    # A large file to load-test the cleaning pipeline (10 million records, written in chunks)
+    # write_messy_banking_data('banking_data_large.csv', 10_000_000)
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()